@@ -0,0 +1,120 @@
+import re
+
+# ============================================================
+# Local (CPU-only) Sentiment + Topic Engine
+# ============================================================
+# Lexicon based: no network, microseconds per post. Used as the
+# fallback when the LLM fails and as the fast path in "hybrid"
+# and "local" SENTIMENT_ENGINE modes (see ai_module.py).
+
+# Shared with /analytics/feature-comparison
+FEATURE_KEYWORDS = {
+    "price": ["price", "cost", "expensive", "affordable", "value"],
+    "comfort": ["comfort", "seat", "interior"],
+    "performance": ["performance", "power", "engine", "speed"],
+    "mileage": ["mileage", "fuel", "economy"]
+}
+
+# key_topic vocabulary from build_sentiment_prompt, first hit wins ties
+TOPIC_KEYWORDS = {
+    "mileage": FEATURE_KEYWORDS["mileage"] + ["kmpl", "average"],
+    "engine": ["engine", "gearbox", "transmission", "clutch", "turbo"],
+    "service": ["service", "maintenance", "repair", "workshop", "spare"],
+    "price": FEATURE_KEYWORDS["price"] + ["costly", "cheap", "emi"],
+    "comfort": FEATURE_KEYWORDS["comfort"] + ["suspension", "ride", "cabin", "legroom"],
+    "performance": ["performance", "power", "speed", "pickup", "acceleration", "torque", "handling"],
+    "design": ["design", "look", "style", "premium", "exterior", "colour", "color"],
+    "safety": ["safety", "airbag", "ncap", "brake", "crash"],
+    "features": ["feature", "infotainment", "sunroof", "screen", "camera", "connectivity"],
+    "resale": ["resale"],
+    "availability": ["availability", "waiting", "delivery", "stock", "booking"],
+    "customer_support": ["support", "dealer", "customer care", "showroom", "staff"]
+}
+
+POSITIVE_WORDS = {
+    "good", "great", "amazing", "excellent", "awesome", "best", "love", "loved",
+    "nice", "smooth", "comfortable", "reliable", "premium", "powerful", "attractive",
+    "impressive", "superb", "fantastic", "happy", "satisfied", "affordable", "quiet",
+    "efficient", "refined", "solid", "recommend", "perfect", "strong", "fast"
+}
+
+NEGATIVE_WORDS = {
+    "bad", "poor", "worst", "terrible", "awful", "hate", "costly", "expensive",
+    "noisy", "issue", "issues", "problem", "problems", "broke", "broken", "breakdown",
+    "slow", "disappointing", "disappointed", "weak", "rude", "delay", "delayed",
+    "unreliable", "uncomfortable", "overpriced", "leak", "rattle", "useless", "high"
+}
+
+NEGATIONS = {"not", "no", "never", "isn't", "wasn't", "don't", "doesn't", "didn't", "hardly"}
+
+_TOKEN = re.compile(r"[a-z']+")
+
+# Whole words only ("emi" must not match "premium", "ride" not "pride");
+# plural forms count ("seats", "brakes"), multi-word keywords match as phrases
+_TOPIC_PATTERNS = {
+    topic: re.compile(
+        r"\b(" + "|".join(re.escape(w) for w in words) + r")(?:s|es)?\b"
+    )
+    for topic, words in TOPIC_KEYWORDS.items()
+}
+
+# Evidence needed for full confidence. One cue, however clear, stays
+# below SENTIMENT_LOCAL_MIN_CONFIDENCE (0.8) so hybrid mode asks the LLM;
+# three agreeing cues clear it.
+CONFIDENT_HITS = 4
+
+
+def classify_topic(text_lower):
+    scores = {
+        # Distinct keywords, like the substring version counted them
+        topic: len(set(pattern.findall(text_lower)))
+        for topic, pattern in _TOPIC_PATTERNS.items()
+    }
+    topic, hits = max(scores.items(), key=lambda x: x[1])
+    return topic if hits else "other"
+
+
+def score_sentiment(text_lower):
+    tokens = _TOKEN.findall(text_lower)
+    positive = negative = 0
+
+    for i, token in enumerate(tokens):
+        polarity = 1 if token in POSITIVE_WORDS else -1 if token in NEGATIVE_WORDS else 0
+        if not polarity:
+            continue
+
+        # "not good" → negative, "never bad" → positive
+        if any(t in NEGATIONS for t in tokens[max(0, i - 3):i]):
+            polarity = -polarity
+
+        if polarity > 0:
+            positive += 1
+        else:
+            negative += 1
+
+    return positive, negative
+
+
+def local_analyze(text: str):
+    """Same shape as the LLM JSON (minus brand, left to detect_brand)."""
+    text_lower = text.lower()
+    positive, negative = score_sentiment(text_lower)
+    hits = positive + negative
+
+    if not hits or positive == negative:
+        sentiment = "neutral"
+        confidence = 0.5
+    else:
+        sentiment = "positive" if positive > negative else "negative"
+        # Agreement between cues *and* the amount of evidence: 1 cue → 0.61,
+        # 2 → 0.72, 3 → 0.84, 4+ → 0.95; mixed cues scale down
+        agreement = abs(positive - negative) / hits
+        evidence = min(hits, CONFIDENT_HITS) / CONFIDENT_HITS
+        confidence = round(0.5 + 0.45 * agreement * evidence, 2)
+
+    return {
+        "brand": None,
+        "sentiment": sentiment,
+        "confidence": confidence,
+        "key_topic": classify_topic(text_lower)
+    }
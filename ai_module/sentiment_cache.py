@@ -0,0 +1,131 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# ============================================================
+# Sentiment Result Cache
+# ============================================================
+# Two tiers:
+#   1. bounded in-process LRU (always on)
+#   2. optional persistent store (any object with get/set/prune,
+#      e.g. backend.sentiment_store.DBSentimentStore)
+# Entries are the parsed LLM JSON, keyed on normalized text plus
+# model and prompt version, so prompt changes never serve stale data.
+
+_RETWEET_PREFIX = re.compile(r"^rt\s+@\w+:?\s*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    text = _WHITESPACE.sub(" ", text.strip().lower())
+    return _RETWEET_PREFIX.sub("", text)
+
+
+def cache_key(text, model, prompt_version):
+    raw = f"{model}|{prompt_version}|{normalize_text(text)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+
+    def __init__(self, max_entries=10000, ttl_seconds=7 * 24 * 3600, store=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.store_errors = 0
+
+        # Persistent tier drops expired rows every N writes
+        self.prune_every = 500
+        self._writes = 0
+
+    # ---------------- memory tier ----------------
+
+    def _get_memory(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, stored_at = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def _set_memory(self, key, value, stored_at=None):
+        with self._lock:
+            self._entries[key] = (value, stored_at or time.time())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    # ---------------- persistent tier ----------------
+
+    def _store_call(self, method, *args):
+        # A broken store must never fail the analysis itself
+        try:
+            return getattr(self.store, method)(*args)
+        except Exception:
+            self.store_errors += 1
+            return None
+
+    # ---------------- public API ----------------
+
+    def get(self, key):
+        value = self._get_memory(key)
+        if value is not None:
+            self.hits += 1
+            return dict(value)
+
+        if self.store is not None:
+            value = self._store_call("get", key, self.ttl_seconds)
+            if value is not None:
+                self.store_hits += 1
+                self._set_memory(key, value)
+                return dict(value)
+
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        self._set_memory(key, dict(value))
+
+        if self.store is not None:
+            self._store_call("set", key, value)
+
+            self._writes += 1
+            if self._writes % self.prune_every == 0:
+                self._store_call("prune", self.ttl_seconds)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.store_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "persistent": self.store is not None,
+            "hits": self.hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "store_errors": self.store_errors,
+            "hit_rate": round((self.hits + self.store_hits) / lookups, 3) if lookups else 0
+        }
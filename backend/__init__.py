@@ -0,0 +1,6 @@
+# Local .env (no-op when the file is absent, e.g. on Render / Vercel).
+# Loaded here so the app and every `python -m backend.*` command see it
+# before any module reads its settings.
+from dotenv import load_dotenv
+
+load_dotenv()
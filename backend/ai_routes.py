@@ -1,18 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from backend.database import get_db
 from backend import models
+from backend.price_refresher import refresh_pending_prices
+from backend.product_matcher import product_matcher
+from backend.singleflight import SingleFlight
+from backend.sentiment_stats import record_reviews, stats_for
+from backend.response_cache import bump_generation
+from backend.feature_index import feature_taxonomy
+from fastapi.concurrency import run_in_threadpool
 from ai_module.ai_module import (
-    analyze_sentiment,
-    fetch_model_price,
-    generate_ai_verdict
+    analyze_sentiment_async,
+    generate_ai_verdict_async,
+    sentiment_cache
 )
-from collections import Counter
+import asyncio
+import json
+import os
 import random
 
+# Max parallel LLM calls per /analyze/batch request
+ANALYZE_BATCH_CONCURRENCY = int(os.getenv("ANALYZE_BATCH_CONCURRENCY", "8"))
+ANALYZE_BATCH_MAX_ITEMS = int(os.getenv("ANALYZE_BATCH_MAX_ITEMS", "1000"))
+
 # Demo city coordinates (India major cities)
 DEFAULT_LOCATIONS = [
     (19.0760, 72.8777),  # Mumbai
@@ -37,102 +54,410 @@ class AnalyzeRequest(BaseModel):
     text: str
     latitude: Optional[float] = None
     longitude: Optional[float] = None
+    # Original post time, for historical imports
+    created_at: Optional[datetime] = None
+
+
+class AnalyzeBatchRequest(BaseModel):
+    items: List[AnalyzeRequest] = Field(..., max_length=ANALYZE_BATCH_MAX_ITEMS)
+    concurrency: Optional[int] = Field(None, ge=1, le=64)
+
+
+# =========================
+# Ingest Helpers
+# =========================
+def resolve_location(request: AnalyzeRequest):
+    lat = request.latitude
+    lon = request.longitude
+
+    # If location not provided, assign random demo city
+    if not lat or not lon:
+        lat, lon = random.choice(DEFAULT_LOCATIONS)
+
+    return lat, lon
+
+
+def match_product(text_lower):
+    # Longest existing model name found inside the text → product id
+    return product_matcher.longest_match(text_lower)
+
+
+def new_model_name(text):
+    # Unknown model → use first 2 words of the post
+    words = text.split()
+    return " ".join(words[:2]).title()
 
 
 # ============================================================
 # 1️⃣ SENTIMENT + SMART PRODUCT LINKING
 # ============================================================
-@router.post("/analyze")
-def analyze_text(request: AnalyzeRequest, db: Session = Depends(get_db)):
+# LLM calls are awaited on the event loop; blocking ORM work
+# is pushed to the threadpool so a slow provider never pins
+# a worker thread.
+
+def refresh_products(db: Session):
+    # Call before any writes: the periodic full rebuild uses its own
+    # session; on `db` only products newer than the matcher are loaded
+    product_matcher.rebuild_if_expired()
+    product_matcher.catch_up(db)
+
+
+def get_or_create_product(db: Session, model_name, company):
+    """(product_id, created) for model_name, safe under concurrent ingests.
+
+    products has a unique index on lower(model_name): a racing insert
+    of the same model does nothing and we read the winner's row instead.
+    """
+    # Price is looked up off the request path (backend/price_refresher.py)
+    values = dict(
+        model_name=model_name,
+        company=company,
+        company_key=company.lower(),
+        current_price=0,
+        price_status="pending"
+    )
+
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        insert_fn = pg_insert if dialect == "postgresql" else sqlite_insert
+        product_id = db.execute(
+            insert_fn(models.Product)
+            .values(**values)
+            .on_conflict_do_nothing()
+            .returning(models.Product.id)
+        ).scalar()
+
+        if product_id is not None:
+            return product_id, True
+    else:
+        try:
+            with db.begin_nested():
+                product = models.Product(**values)
+                db.add(product)
+            return product.id, True
+        except IntegrityError:
+            pass
+
+    existing = (
+        db.query(models.Product.id)
+        .filter(func.lower(models.Product.model_name) == model_name.lower())
+        .order_by(models.Product.id)
+        .first()
+    )
+    return existing.id, False
 
-    text = request.text.strip()
-    text_lower = text.lower()
 
-    result = analyze_sentiment(text)
+def store_analysis(db: Session, text, result, lat, lon, created_at=None):
+    """The whole DB phase of /analyze: one short transaction, no network calls.
 
+    Returns (product_id, created) where created means a new pending product.
+    """
     brand = result.get("brand", "Unknown")
     sentiment = result.get("sentiment", "neutral")
     confidence = result.get("confidence", 0.5)
+    created_at = created_at or datetime.utcnow()
+    # Before any writes: a taxonomy reload uses its own session
+    feature_mask = feature_taxonomy.mask_for(text)
 
-    lat = request.latitude
-    lon = request.longitude
-
-    # If location not provided, assign random demo city
-    if not lat or not lon:
-        lat, lon = random.choice(DEFAULT_LOCATIONS)
+    # =========================================================
+    # 🔥 SMART PRODUCT MATCH
+    # =========================================================
+    refresh_products(db)
+    product_id = match_product(text.lower())
+    created = False
 
+    # 🔥 If not found → create using first 2 words
+    if not product_id and brand != "Unknown":
+        product_id, created = get_or_create_product(db, new_model_name(text), brand.title())
 
     # ✅ Store Social Post
-    new_post = models.SocialPost(
+    db.add(models.SocialPost(
         brand=brand,
         text=text,
         latitude=lat,
         longitude=lon,
         sentiment=sentiment,
-        confidence=confidence
+        confidence=confidence,
+        engine=result.get("engine"),
+        created_at=created_at
+    ))
+
+    # ✅ ALWAYS INSERT REVIEW IF PRODUCT EXISTS
+    if product_id:
+        review = models.Review(
+            product_id=product_id,
+            comment=text,
+            sentiment=sentiment,
+            confidence=confidence,
+            key_topic=result.get("key_topic", "other"),
+            engine=result.get("engine"),
+            feature_mask=feature_mask,
+            latitude=lat,
+            longitude=lon,
+            brand=brand.title(),
+            created_at=created_at
+        )
+        db.add(review)
+        record_reviews(db, [review])
+
+    db.commit()
+    bump_generation()
+
+    return product_id, created
+
+
+@router.post("/analyze")
+async def analyze_text(
+    request: AnalyzeRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+
+    text = request.text.strip()
+
+    # 🧠 All LLM work happens before the session touches a connection
+    result = await analyze_sentiment_async(text)
+
+    lat, lon = resolve_location(request)
+
+    product_id, created = await run_in_threadpool(
+        store_analysis, db, text, result, lat, lon, request.created_at
     )
-    db.add(new_post)
 
-    # =========================================================
-    # 🔥 SMART PRODUCT MATCH
-    # Instead of matching full sentence,
-    # check if any existing model name exists inside text
-    # =========================================================
+    if created:
+        background_tasks.add_task(refresh_pending_prices, [product_id])
 
-    products = db.query(models.Product).all()
-    product = None
+    return {
+        **result,
+        "latitude": lat,
+        "longitude": lon
+    }
 
-    for p in products:
-        if p.model_name.lower() in text_lower:
-            product = p
-            break
 
-    # 🔥 If not found → create using first 2 words
-    if not product and brand != "Unknown":
-        words = text.split()
-        model_name = " ".join(words[:2]).title()
+# ============================================================
+# 1️⃣b BATCH INGESTION (concurrent LLM fan-out, one commit)
+# ============================================================
+def match_batch(items, analyzed):
+    """Product per item: existing id, new model name, or None.
 
-        real_price = fetch_model_price(model_name)
+    Also returns {new model name: company} for models not seen before.
+    """
+    matched = []
+    new_models = {}
+
+    for item, (result, error) in zip(items, analyzed):
+        if error:
+            matched.append(None)
+            continue
+
+        text = item.text.strip()
+        text_lower = text.lower()
+        product = match_product(text_lower)
+        brand = result.get("brand", "Unknown")
+
+        # Models first seen earlier in this batch count as existing
+        if not product:
+            product = next((m for m in new_models if m.lower() in text_lower), None)
+
+        if not product and brand != "Unknown":
+            model_name = new_model_name(text)
+            # Same new model twice in one batch → one Product row
+            new_models.setdefault(model_name, brand.title())
+            product = model_name
+
+        matched.append(product)
+
+    return matched, new_models
 
-        product = models.Product(
-            model_name=model_name,
-            company=brand.title(),
-            current_price=real_price
-        )
-        db.add(product)
-        db.flush()
+
+def store_batch(db: Session, items, analyzed, before_commit=None):
+    """The whole DB phase of a batch: one transaction, no network calls."""
+    # Before any writes: a taxonomy reload uses its own session
+    feature_masks = [feature_taxonomy.mask_for(item.text.strip()) for item in items]
 
     # =========================================================
-    # ✅ ALWAYS INSERT REVIEW IF PRODUCT EXISTS
+    # 🔥 PRODUCT MATCH (matcher refreshed once per batch)
     # =========================================================
-    if product:
-        new_review = models.Review(
-            product_id=product.id,
-            comment=text,
-            sentiment=sentiment,
-            confidence=confidence,
+    refresh_products(db)
+    matched, new_models = match_batch(items, analyzed)
+
+    new_product_ids = []
+    new_model_ids = {}
+
+    # Sorted → concurrent batches insert/lock products in the same order
+    for model_name in sorted(new_models):
+        product_id, created = get_or_create_product(db, model_name, new_models[model_name])
+        new_model_ids[model_name] = product_id
+        if created:
+            new_product_ids.append(product_id)
+
+    rows = []
+    results = []
+
+    for index, (item, (result, error), product_id) in enumerate(zip(items, analyzed, matched)):
+        if error:
+            results.append({"index": index, "ok": False, "error": error})
+            continue
+
+        # New model names → ids from get_or_create_product above
+        if isinstance(product_id, str):
+            product_id = new_model_ids[product_id]
+
+        text = item.text.strip()
+        brand = result.get("brand", "Unknown")
+        sentiment = result.get("sentiment", "neutral")
+        confidence = result.get("confidence", 0.5)
+        lat, lon = resolve_location(item)
+        created_at = item.created_at or datetime.utcnow()
+
+        rows.append(models.SocialPost(
+            brand=brand,
+            text=text,
             latitude=lat,
             longitude=lon,
-            brand=brand.title()
-        )
-        db.add(new_review)
+            sentiment=sentiment,
+            confidence=confidence,
+            engine=result.get("engine"),
+            created_at=created_at
+        ))
+
+        if product_id:
+            rows.append(models.Review(
+                product_id=product_id,
+                comment=text,
+                sentiment=sentiment,
+                confidence=confidence,
+                key_topic=result.get("key_topic", "other"),
+                engine=result.get("engine"),
+                feature_mask=feature_masks[index],
+                latitude=lat,
+                longitude=lon,
+                brand=brand.title(),
+                created_at=created_at
+            ))
+
+        results.append({
+            "index": index,
+            "ok": True,
+            **result,
+            "latitude": lat,
+            "longitude": lon
+        })
+
+    # ✅ BULK INSERT POSTS + REVIEWS, SINGLE COMMIT
+    db.add_all(rows)
+    record_reviews(db, [r for r in rows if isinstance(r, models.Review)])
+
+    # Lets callers (e.g. the ingest queue) ride on the same transaction
+    if before_commit is not None:
+        before_commit(db, results)
 
     db.commit()
+    bump_generation()
+
+    return results, new_product_ids
+
+
+async def ingest_batch(db: Session, items, concurrency=None, before_commit=None):
+    """Analyze items concurrently and store them in one commit.
+
+    Shared by POST /analyze/batch and backend/bulk_import.py.
+    Returns (per-item results in input order, ids of new pending products).
+    """
+    limit = asyncio.Semaphore(concurrency or ANALYZE_BATCH_CONCURRENCY)
+
+    async def run(item):
+        text = item.text.strip()
+        if not text:
+            return None, "Empty text"
+        try:
+            async with limit:
+                return await analyze_sentiment_async(text), None
+        except Exception as e:
+            return None, str(e)
+
+    # 🔥 Sentiment calls run concurrently, gather keeps input order
+    analyzed = await asyncio.gather(*(run(item) for item in items))
+
+    # 🧠 LLM work is done → one short DB phase
+    return await run_in_threadpool(store_batch, db, items, analyzed, before_commit)
+
+
+@router.post("/analyze/batch")
+async def analyze_batch(
+    request: AnalyzeBatchRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+
+    items = request.items
+    if not items:
+        return {"processed": 0, "failed": 0, "results": []}
+
+    results, new_product_ids = await ingest_batch(db, items, request.concurrency)
+
+    if new_product_ids:
+        background_tasks.add_task(refresh_pending_prices, new_product_ids)
+
+    failed = sum(1 for r in results if not r["ok"])
 
     return {
-        **result,
-        "latitude": lat,
-        "longitude": lon
+        "processed": len(results) - failed,
+        "failed": failed,
+        "results": results
     }
 
 
 # ============================================================
-# 2️⃣ DEEP SCAN (ROBUST VERSION)
+# 1️⃣c QUEUED INGESTION (202 now, analysis by background workers)
 # ============================================================
-@router.post("/analyze-product")
-def analyze_product(request: AnalyzeRequest, db: Session = Depends(get_db)):
+@router.post("/analyze/enqueue", status_code=202)
+def enqueue_analysis(request: AnalyzeRequest, db: Session = Depends(get_db)):
 
-    search_text = request.text.strip().lower()
+    text = request.text.strip()
+    if not text:
+        raise HTTPException(status_code=422, detail="Empty text")
+
+    job = models.IngestJob(
+        text=text,
+        latitude=request.latitude,
+        longitude=request.longitude,
+        posted_at=request.created_at or datetime.utcnow(),
+        status="pending"
+    )
+    db.add(job)
+    db.commit()
+
+    return {
+        "job_id": job.id,
+        "status": job.status
+    }
+
+
+@router.get("/jobs/{job_id}")
+def job_status(job_id: int, db: Session = Depends(get_db)):
+
+    job = db.get(models.IngestJob, job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "error": job.error,
+        "result": json.loads(job.result) if job.result else None,
+        "enqueued_at": job.enqueued_at,
+        "finished_at": job.finished_at
+    }
+
+
+# ============================================================
+# 2️⃣ DEEP SCAN (ROBUST VERSION)
+# ============================================================
+def product_scan(db: Session, search_text):
 
     # 🔥 Flexible search
     product = db.query(models.Product).filter(
@@ -142,23 +467,13 @@ def analyze_product(request: AnalyzeRequest, db: Session = Depends(get_db)):
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    reviews_query = db.query(models.Review).filter(
-        models.Review.product_id == product.id
-    )
-
-    total_reviews = reviews_query.count()
-
-    positive = reviews_query.filter(
-        models.Review.sentiment == "positive"
-    ).count()
+    # 🔥 Counters come from the product_sentiment_stats rollup
+    stats = stats_for(db, [product.id])[product.id]
 
-    negative = reviews_query.filter(
-        models.Review.sentiment == "negative"
-    ).count()
-
-    confidence_avg = db.query(func.avg(models.Review.confidence)).filter(
-        models.Review.product_id == product.id
-    ).scalar() or 0
+    total_reviews = stats["total"]
+    positive = stats["positive"]
+    negative = stats["negative"]
+    confidence_avg = stats["avg_confidence"]
 
     sentiment_summary = {
         "positive_percent": int((positive / total_reviews) * 100) if total_reviews else 0,
@@ -167,44 +482,81 @@ def analyze_product(request: AnalyzeRequest, db: Session = Depends(get_db)):
     }
 
     # =========================================================
-    # 🔥 Topic Fingerprint (Recalculated Live)
+    # 🔥 Topic Fingerprint (stored at ingest, one GROUP BY)
+    # Rows written before key_topic existed count as "other"
+    # until backend/backfill_key_topics.py has been run.
     # =========================================================
-    reviews = reviews_query.all()
-    topic_counter = Counter()
+    topic_rows = (
+        db.query(
+            func.coalesce(models.Review.key_topic, "other").label("topic"),
+            func.count(models.Review.id).label("count")
+        )
+        .filter(models.Review.product_id == product.id)
+        .group_by(func.coalesce(models.Review.key_topic, "other"))
+        .all()
+    )
 
-    for review in reviews:
-        topic_result = analyze_sentiment(review.comment)
-        topic = topic_result.get("key_topic", "other")
-        topic_counter[topic] += 1
+    # Share of this product's reviews *as counted here*, so the
+    # percentages stay consistent even if the rollup has drifted
+    topic_total = sum(count for _, count in topic_rows)
 
     fingerprint = []
 
-    for topic, count in topic_counter.items():
-        percentage = int((count / total_reviews) * 100) if total_reviews else 0
+    for topic, count in topic_rows:
+        percentage = int((count / topic_total) * 100) if topic_total else 0
         fingerprint.append({
             "topic": topic,
             "strength": percentage
         })
 
+    return {
+        "product_id": product.id,
+        "model_name": product.model_name,
+        "company": product.company,
+        "current_price": product.current_price,
+        "sentiment_summary": sentiment_summary,
+        "fingerprint": fingerprint,
+        "total_reviews": total_reviews
+    }
+
+
+# Identical concurrent deep scans (polling dashboards) share one computation
+_deep_scans = SingleFlight()
+
+
+async def deep_scan(db: Session, search_text):
+
+    scan = await run_in_threadpool(product_scan, db, search_text)
+
     # =========================================================
     # 🔥 AI Verdict
     # =========================================================
     verdict = "Not enough data for verdict."
 
-    if total_reviews > 0:
-        verdict = generate_ai_verdict(
-            product.model_name,
-            sentiment_summary["positive_percent"],
-            sentiment_summary["negative_percent"]
+    if scan["total_reviews"] > 0:
+        verdict = await generate_ai_verdict_async(
+            scan["model_name"],
+            scan["sentiment_summary"]["positive_percent"],
+            scan["sentiment_summary"]["negative_percent"]
         )
 
     return {
-        "product_id": product.id,
-        "model_name": product.model_name,
-        "company": product.company,
-        "current_price": product.current_price,
-        "sentiment_summary": sentiment_summary,
-        "fingerprint": fingerprint,
-        "total_reviews": total_reviews,
+        **scan,
         "ai_verdict": verdict
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/analyze-product")
+async def analyze_product(request: AnalyzeRequest, db: Session = Depends(get_db)):
+
+    search_text = request.text.strip().lower()
+
+    return await _deep_scans.do(search_text, lambda: deep_scan(db, search_text))
+
+
+# ============================================================
+# 3️⃣ SENTIMENT CACHE STATS
+# ============================================================
+@router.get("/cache-stats")
+def cache_stats():
+    return sentiment_cache.stats()
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from backend.database import get_db
+from sqlalchemy import func, case, cast, or_, Integer
+from backend.database import get_read_db
 from backend import models
-
-from datetime import datetime
+from backend.singleflight import SingleFlight
+from backend.sentiment_stats import stats_for, company_product_stats, summarize
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+import os
 
 from datetime import datetime, timedelta
 
@@ -16,26 +19,41 @@ router = APIRouter()
 # -----------------------------
 # HELPER FUNCTIONS
 # -----------------------------
-def sentiment_trend_timewindow(reviews):
-    """Compare last 30 days vs previous 30 days"""
+def sentiment_score_expr():
+    # positive = +1, negative = -1, anything else = 0
+    return case(
+        (models.Review.sentiment == "positive", 1),
+        (models.Review.sentiment == "negative", -1),
+        else_=0
+    )
+
+
+def sentiment_trend_timewindow(db: Session, company: str):
+    """Compare last 30 days vs previous 30 days (one aggregate query)"""
     now = datetime.utcnow()
     last_30 = now - timedelta(days=30)
     prev_60 = now - timedelta(days=60)
 
-    recent = [r for r in reviews if r.created_at >= last_30]
-    previous = [r for r in reviews if prev_60 <= r.created_at < last_30]
-
-    def score(data):
-        if not data:
-            return 0
-        return sum(
-            1 if r.sentiment == "positive"
-            else -1 if r.sentiment == "negative"
-            else 0
-            for r in data
-        ) / len(data)
+    is_recent = models.Review.created_at >= last_30
+    score = sentiment_score_expr()
+
+    recent_sum, recent_count, previous_sum, previous_count = (
+        db.query(
+            func.sum(case((is_recent, score), else_=0)),
+            func.count(case((is_recent, 1))),
+            func.sum(case((is_recent, 0), else_=score)),
+            func.count(case((is_recent, None), else_=1))
+        )
+        .join(models.Product, models.Product.id == models.Review.product_id)
+        .filter(
+            models.Product.company_key == company.lower(),
+            models.Review.created_at >= prev_60
+        )
+        .one()
+    )
 
-    r1, r2 = score(recent), score(previous)
+    r1 = (recent_sum or 0) / recent_count if recent_count else 0
+    r2 = (previous_sum or 0) / previous_count if previous_count else 0
 
     if r1 > r2:
         return "↑ Improving"
@@ -44,6 +62,39 @@ def sentiment_trend_timewindow(reviews):
     return "→ Stable"
 
 
+TREND_GRANULARITIES = ("day", "week", "month")
+
+
+def time_bucket(db: Session, column, granularity):
+    """Start of the day/week/month containing column, computed in SQL."""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(granularity, column)
+
+    # SQLite: weeks start on Monday, like date_trunc('week')
+    if granularity == "week":
+        return func.date(column, "weekday 0", "-6 days")
+    if granularity == "month":
+        return func.date(column, "start of month")
+    return func.date(column)
+
+
+# Map clustering: grid cells of ~MAP_CELL_PIXELS at the requested zoom,
+# capped per axis so a zoomed-out bbox can't explode the cell count
+MAP_CELL_PIXELS = int(os.getenv("MAP_CELL_PIXELS", "64"))
+MAP_MAX_CELLS_PER_AXIS = int(os.getenv("MAP_MAX_CELLS_PER_AXIS", "64"))
+
+
+def grid_cell(db: Session, column, origin, size):
+    """Index of the size-wide grid cell containing column, computed in SQL."""
+    offset = (column - origin) / size
+
+    if db.get_bind().dialect.name == "postgresql":
+        return func.floor(offset)
+
+    # SQLite: CAST truncates, which is floor for the non-negative offsets here
+    return cast(offset, Integer)
+
+
 def ai_feature_gap(c1, c2, company1, company2):
     insights = []
 
@@ -73,26 +124,38 @@ def recommendation(features):
 
 
 
-@router.get("/company-summary/{company}")
-def company_summary(company: str, db: Session = Depends(get_db)):
+def model_stats(product, stats):
+    """Per-model comparison row (product + summarize()d rollup)."""
+    total = stats["total"]
+    positive = stats["positive"]
+    negative = stats["negative"]
 
-    products = db.query(models.Product).filter(
-        func.lower(models.Product.company) == company.lower()
-    ).all()
+    return {
+        "model_name": product.model_name,
+        "company": product.company,
+        "current_price": product.current_price,
+        "total_reviews": total,
+        "positive_percent": int((positive / total) * 100) if total else 0,
+        "negative_percent": int((negative / total) * 100) if total else 0,
+        "avg_confidence": round(float(stats["avg_confidence"]), 2)
+    }
+
+
+# Identical concurrent requests share one computation
+_company_summaries = SingleFlight()
+_comparisons = SingleFlight()
 
-    if not products:
-        raise HTTPException(status_code=404, detail="Company not found")
 
-    product_ids = [p.id for p in products]
+def compute_company_summary(db: Session, company: str):
 
-    total_reviews = db.query(models.Review).filter(
-        models.Review.product_id.in_(product_ids)
-    ).count()
+    # 🔥 One round trip: products + rollup counters
+    products = company_product_stats(db, company)
+
+    if not products:
+        raise HTTPException(status_code=404, detail="Company not found")
 
-    positive_reviews = db.query(models.Review).filter(
-        models.Review.product_id.in_(product_ids),
-        models.Review.sentiment == "positive"
-    ).count()
+    total_reviews = sum(p.total for p in products)
+    positive_reviews = sum(p.positive for p in products)
 
     overall_positive_percent = (
         int((positive_reviews / total_reviews) * 100)
@@ -102,16 +165,7 @@ def company_summary(company: str, db: Session = Depends(get_db)):
     model_scores = []
 
     for p in products:
-        pos = db.query(models.Review).filter(
-            models.Review.product_id == p.id,
-            models.Review.sentiment == "positive"
-        ).count()
-
-        total = db.query(models.Review).filter(
-            models.Review.product_id == p.id
-        ).count()
-
-        score = (pos / total) if total else 0
+        score = (p.positive / p.total) if p.total else 0
         model_scores.append((p.model_name, score))
 
     model_scores.sort(key=lambda x: x[1], reverse=True)
@@ -128,8 +182,19 @@ def company_summary(company: str, db: Session = Depends(get_db)):
         "worst_model": worst_model
     }
 
-@router.get("/compare")
-def compare_products(model1: str, model2: str, db: Session = Depends(get_db)):
+
+@router.get("/company-summary/{company}")
+async def company_summary(company: str, db: Session = Depends(get_read_db)):
+
+    summary = await _company_summaries.do(
+        company.lower(),
+        lambda: run_in_threadpool(compute_company_summary, db, company)
+    )
+
+    # Coalesced across casings → echo this caller's spelling
+    return {**summary, "company": company}
+
+def compute_comparison(db: Session, model1: str, model2: str):
 
     # 🔎 Find products
     product1 = db.query(models.Product).filter(
@@ -143,34 +208,10 @@ def compare_products(model1: str, model2: str, db: Session = Depends(get_db)):
     if not product1 or not product2:
         raise HTTPException(status_code=404, detail="One or both products not found")
 
+    rollup = stats_for(db, [product1.id, product2.id])
+
     def get_stats(product):
-        total = db.query(models.Review).filter(
-            models.Review.product_id == product.id
-        ).count()
-
-        positive = db.query(models.Review).filter(
-            models.Review.product_id == product.id,
-            models.Review.sentiment == "positive"
-        ).count()
-
-        negative = db.query(models.Review).filter(
-            models.Review.product_id == product.id,
-            models.Review.sentiment == "negative"
-        ).count()
-
-        avg_confidence = db.query(func.avg(models.Review.confidence)).filter(
-            models.Review.product_id == product.id
-        ).scalar() or 0
-
-        return {
-            "model_name": product.model_name,
-            "company": product.company,
-            "current_price": product.current_price,
-            "total_reviews": total,
-            "positive_percent": int((positive / total) * 100) if total else 0,
-            "negative_percent": int((negative / total) * 100) if total else 0,
-            "avg_confidence": round(float(avg_confidence), 2)
-        }
+        return model_stats(product, rollup[product.id])
 
     stats1 = get_stats(product1)
     stats2 = get_stats(product2)
@@ -189,32 +230,152 @@ def compare_products(model1: str, model2: str, db: Session = Depends(get_db)):
             "better_model": better_model
         }
     }
+
+
+@router.get("/compare")
+async def compare_products(model1: str, model2: str, db: Session = Depends(get_read_db)):
+
+    return await _comparisons.do(
+        (model1.lower(), model2.lower()),
+        lambda: run_in_threadpool(compute_comparison, db, model1, model2)
+    )
     
 
+COMPARE_MAX_MODELS = int(os.getenv("COMPARE_MAX_MODELS", "50"))
+
+
+def compute_model_comparison(db: Session, names, product_ids):
+    Stats = models.ProductSentimentStats
+
+    # Each name resolves like /compare: first product whose model name
+    # contains it. One scalar subquery per name, all in one statement.
+    first_match = [
+        db.query(func.min(models.Product.id))
+        .filter(models.Product.model_name.icontains(name, autoescape=True))
+        .scalar_subquery()
+        for name in names
+    ]
+
+    # 🔥 Resolve + rollup counters for every model in one round trip
+    rows = (
+        db.query(
+            models.Product.id,
+            models.Product.model_name,
+            models.Product.company,
+            models.Product.current_price,
+            func.coalesce(Stats.total, 0).label("total"),
+            func.coalesce(Stats.positive, 0).label("positive"),
+            func.coalesce(Stats.negative, 0).label("negative"),
+            func.coalesce(Stats.confidence_sum, 0).label("confidence_sum"),
+            func.coalesce(Stats.confidence_count, 0).label("confidence_count")
+        )
+        .outerjoin(Stats, Stats.product_id == models.Product.id)
+        .filter(or_(
+            models.Product.id.in_(product_ids),
+            models.Product.id.in_(first_match)
+        ))
+        .order_by(models.Product.id)
+        .all()
+    )
+
+    by_id = {r.id: r for r in rows}
+    resolved = {}
+    not_found = []
+
+    for name in names:
+        # rows are id-ordered → first hit is the subquery's min(id)
+        row = next((r for r in rows if name.lower() in r.model_name.lower()), None)
+        if row is None:
+            not_found.append(name)
+        else:
+            resolved.setdefault(row.id, row)
+
+    for product_id in product_ids:
+        if product_id in by_id:
+            resolved.setdefault(product_id, by_id[product_id])
+        else:
+            not_found.append(product_id)
+
+    if not resolved:
+        raise HTTPException(status_code=404, detail="No matching products found")
+
+    table = [
+        {"product_id": r.id, **model_stats(r, summarize(r))}
+        for r in resolved.values()
+    ]
+
+    # 🏆 Ranked by positive %, more reviews breaks ties
+    table.sort(key=lambda m: (m["positive_percent"], m["total_reviews"]), reverse=True)
+
+    for rank, entry in enumerate(table, start=1):
+        entry["rank"] = rank
+
+    return {
+        "models": table,
+        "best_model": table[0]["model_name"],
+        "not_found": not_found
+    }
+
+
+@router.get("/compare-models")
+def compare_models(
+    model: list[str] = Query([]),
+    product_id: list[int] = Query([]),
+    db: Session = Depends(get_read_db)
+):
+    """Rank any number of models (?model=creta&model=seltos&product_id=7)."""
+    names = [m.strip() for m in model if m.strip()]
+
+    if not names and not product_id:
+        raise HTTPException(status_code=400, detail="Pass at least one model or product_id")
+
+    if len(names) + len(product_id) > COMPARE_MAX_MODELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {COMPARE_MAX_MODELS} models per comparison"
+        )
+
+    return compute_model_comparison(db, names, product_id)
+
+
 @router.get("/trend/{brand}")
-def brand_trend(brand: str, db: Session = Depends(get_db)):
+def brand_trend(brand: str, db: Session = Depends(get_read_db)):
+
+    brand_filter = func.lower(models.Review.brand) == brand.lower()
+    is_positive = case((models.Review.sentiment == "positive", 1), else_=0)
 
-    reviews = db.query(models.Review).filter(
-        func.lower(models.Review.brand) == brand.lower()
-    ).order_by(models.Review.id.desc()).all()
+    total, total_positive = db.query(
+        func.count(models.Review.id),
+        func.sum(is_positive)
+    ).filter(brand_filter).one()
 
-    if not reviews:
+    if not total:
         return {"message": "No data"}
 
-    # Split latest half vs older half
-    mid = len(reviews) // 2
+    # Split latest half vs older half (by id, newest first)
+    mid = total // 2
 
-    current_reviews = reviews[:mid]
-    previous_reviews = reviews[mid:]
+    latest = (
+        db.query(models.Review.sentiment)
+        .filter(brand_filter)
+        .order_by(models.Review.id.desc())
+        .limit(mid)
+        .subquery()
+    )
+
+    current_positive = db.query(
+        func.count()
+    ).select_from(latest).filter(latest.c.sentiment == "positive").scalar()
+
+    previous_positive = (total_positive or 0) - current_positive
 
-    def calculate_sentiment(data):
-        if not data:
+    def calculate_sentiment(positive, count):
+        if not count:
             return 0
-        positive = sum(1 for r in data if r.sentiment == "positive")
-        return int((positive / len(data)) * 100)
+        return int((positive / count) * 100)
 
-    current_percent = calculate_sentiment(current_reviews)
-    previous_percent = calculate_sentiment(previous_reviews)
+    current_percent = calculate_sentiment(current_positive, mid)
+    previous_percent = calculate_sentiment(previous_positive, total - mid)
 
     change = current_percent - previous_percent
 
@@ -234,38 +395,144 @@ def brand_trend(brand: str, db: Session = Depends(get_db)):
     }
 
 
+@router.get("/sentiment-trend")
+def sentiment_trend(
+    granularity: str = Query("day", pattern="^(day|week|month)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    brand: Optional[str] = None,
+    company: Optional[str] = None,
+    product_id: Optional[int] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Review sentiment time series, bucketed and counted in the database."""
+
+    bucket = time_bucket(db, models.Review.created_at, granularity).label("bucket")
+
+    query = db.query(
+        bucket,
+        func.count(models.Review.id).label("total"),
+        func.sum(case((models.Review.sentiment == "positive", 1), else_=0)).label("positive"),
+        func.sum(case((models.Review.sentiment == "negative", 1), else_=0)).label("negative")
+    ).filter(models.Review.created_at.isnot(None))
+
+    if start:
+        query = query.filter(models.Review.created_at >= start)
+    if end:
+        query = query.filter(models.Review.created_at < end)
+    if brand:
+        query = query.filter(func.lower(models.Review.brand) == brand.lower())
+    if product_id:
+        query = query.filter(models.Review.product_id == product_id)
+    if company:
+        query = query.join(
+            models.Product, models.Product.id == models.Review.product_id
+        ).filter(models.Product.company_key == company.lower())
+
+    rows = query.group_by(bucket).order_by(bucket).all()
+
+    def bucket_label(value):
+        # date_trunc → datetime (Postgres), date() → "YYYY-MM-DD" (SQLite)
+        return value.date().isoformat() if hasattr(value, "date") else str(value)[:10]
+
+    return {
+        "granularity": granularity,
+        "series": [
+            {
+                "bucket": bucket_label(r.bucket),
+                "total": r.total,
+                "positive": r.positive,
+                "negative": r.negative,
+                "neutral": r.total - r.positive - r.negative,
+                "positive_percent": int((r.positive / r.total) * 100) if r.total else 0
+            }
+            for r in rows
+        ]
+    }
+
+
+@router.get("/review-clusters")
+def review_clusters(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    zoom: int = Query(..., ge=0, le=22),
+    brand: Optional[str] = None,
+    sentiment: Optional[str] = Query(None, pattern="^(positive|negative|neutral)$"),
+    db: Session = Depends(get_read_db)
+):
+    """Review points in a bbox, aggregated per grid cell for the map.
+
+    Payload size depends on the bbox and zoom, never on the number of reviews.
+    """
+    if min_lat >= max_lat or min_lon >= max_lon:
+        raise HTTPException(status_code=400, detail="Empty bounding box")
+
+    # Web-mercator tiles are 256px and 360/2^zoom degrees wide
+    cell_size = max(
+        360 / (2 ** zoom) * MAP_CELL_PIXELS / 256,
+        (max_lat - min_lat) / MAP_MAX_CELLS_PER_AXIS,
+        (max_lon - min_lon) / MAP_MAX_CELLS_PER_AXIS
+    )
+
+    # Anchored at -90/-180 so cells don't shift as the map pans
+    cell_y = grid_cell(db, models.Review.latitude, -90, cell_size).label("cell_y")
+    cell_x = grid_cell(db, models.Review.longitude, -180, cell_size).label("cell_x")
+
+    query = db.query(
+        cell_y,
+        cell_x,
+        func.count(models.Review.id).label("total"),
+        func.sum(case((models.Review.sentiment == "positive", 1), else_=0)).label("positive"),
+        func.sum(case((models.Review.sentiment == "negative", 1), else_=0)).label("negative"),
+        func.avg(models.Review.latitude).label("latitude"),
+        func.avg(models.Review.longitude).label("longitude")
+    ).filter(
+        models.Review.latitude.between(min_lat, max_lat),
+        models.Review.longitude.between(min_lon, max_lon)
+    )
+
+    if brand:
+        query = query.filter(func.lower(models.Review.brand) == brand.lower())
+    if sentiment:
+        query = query.filter(models.Review.sentiment == sentiment)
+
+    rows = query.group_by(cell_y, cell_x).all()
+
+    return {
+        "zoom": zoom,
+        "cell_size": cell_size,
+        "total": sum(r.total for r in rows),
+        "clusters": [
+            {
+                # Centroid of the cell's points → markers sit where the data is
+                "latitude": r.latitude,
+                "longitude": r.longitude,
+                "total": r.total,
+                "positive": r.positive,
+                "negative": r.negative,
+                "neutral": r.total - r.positive - r.negative
+            }
+            for r in rows
+        ]
+    }
+
+
 @router.get("/company-model-insights/{company}")
-def company_model_insights(company: str, db: Session = Depends(get_db)):
-
-    products = db.query(models.Product).filter(
-        func.lower(models.Product.company) == company.lower()
-    ).all()
-
-    response = []
-
-    for product in products:
-        total = db.query(models.Review).filter(
-            models.Review.product_id == product.id
-        ).count()
-
-        positive = db.query(models.Review).filter(
-            models.Review.product_id == product.id,
-            models.Review.sentiment == "positive"
-        ).count()
-
-        negative = db.query(models.Review).filter(
-            models.Review.product_id == product.id,
-            models.Review.sentiment == "negative"
-        ).count()
-
-        response.append({
-            "model": product.model_name,
-            "total_reviews": total,
-            "positive": positive,
-            "negative": negative,
-            "positive_percent":
-                int((positive/total)*100) if total else 0
-        })
+def company_model_insights(company: str, db: Session = Depends(get_read_db)):
 
-    return response
+    # 🔥 One round trip: products + rollup counters
+    products = company_product_stats(db, company)
 
+    return [
+        {
+            "model": p.model_name,
+            "total_reviews": p.total,
+            "positive": p.positive,
+            "negative": p.negative,
+            "positive_percent":
+                int((p.positive/p.total)*100) if p.total else 0
+        }
+        for p in products
+    ]
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from backend.database import get_db
+from sqlalchemy import func, case
+from backend.database import get_read_db
 from backend import models
+from backend.feature_index import feature_taxonomy
+from backend.response_cache import analytics_cache
+from backend.snapshots import SNAPSHOTS, snapshot_response
 from backend.analytics_extra import (
     ai_feature_gap,
     sentiment_trend_timewindow,
@@ -15,7 +18,12 @@ router = APIRouter()
 # BRAND SUMMARY
 # -----------------------------
 @router.get("/brand-summary")
-def brand_summary(db: Session = Depends(get_db)):
+def brand_summary(request: Request, db: Session = Depends(get_read_db)):
+    # Precomputed by the snapshot refresher (backend/snapshots.py)
+    return snapshot_response(request, db, "brand-summary")
+
+
+def compute_brand_summary(db: Session):
     result = (
         db.query(
             models.SocialPost.brand,
@@ -28,11 +36,19 @@ def brand_summary(db: Session = Depends(get_db)):
     return [{"brand": r.brand, "total_posts": r.total_posts} for r in result]
 
 
+SNAPSHOTS["brand-summary"] = compute_brand_summary
+
+
 # -----------------------------
 # MARKET SENTIMENT SHARE
 # -----------------------------
 @router.get("/market-sentiment-share")
-def market_sentiment_share(db: Session = Depends(get_db)):
+def market_sentiment_share(request: Request, db: Session = Depends(get_read_db)):
+    # Precomputed by the snapshot refresher (backend/snapshots.py)
+    return snapshot_response(request, db, "market-sentiment-share")
+
+
+def compute_market_sentiment_share(db: Session):
 
     results = (
         db.query(
@@ -56,39 +72,52 @@ def market_sentiment_share(db: Session = Depends(get_db)):
     ]
 
 
+SNAPSHOTS["market-sentiment-share"] = compute_market_sentiment_share
+
+
 
 
 
 
 @router.get("/feature-comparison")
+def feature_comparison(company1: str, company2: str, request: Request, db: Session = Depends(get_read_db)):
+    return analytics_cache.respond(
+        request, lambda: compute_feature_comparison(db, company1, company2)
+    )
 
-def feature_comparison(company1: str, company2: str, db: Session = Depends(get_db)):
 
-    features = {
-        "price": ["price", "cost", "expensive", "affordable", "value"],
-        "comfort": ["comfort", "seat", "interior"],
-        "performance": ["performance", "power", "engine", "speed"],
-        "mileage": ["mileage", "fuel", "economy"]
-    }
+def compute_feature_comparison(db: Session, company1: str, company2: str):
 
-    def analyze(company):
-        results = {f: 0 for f in features}
+    features = feature_taxonomy.features()
+    companies = {company1.lower(), company2.lower()}
+    company_key = models.Product.company_key
 
-        reviews = (
-            db.query(models.Review.comment, models.Review.sentiment)
-            .join(models.Product, models.Product.id == models.Review.product_id)
-            .filter(func.lower(models.Product.company) == company.lower())
-            .all()
+    # 🔥 Positive mentions per feature, per company: one grouped count
+    rows = (
+        db.query(
+            company_key.label("company"),
+            *[
+                func.sum(case(
+                    (models.Review.feature_mask.op("&")(1 << bit) != 0, 1),
+                    else_=0
+                )).label(name)
+                for name, bit, _ in features
+            ]
         )
+        .join(models.Product, models.Product.id == models.Review.product_id)
+        .filter(
+            company_key.in_(companies),
+            models.Review.sentiment == "positive"
+        )
+        .group_by(company_key)
+        .all()
+    )
 
-        for comment, sentiment in reviews:
-            if sentiment != "positive":
-                continue
+    counts = {r.company: r for r in rows}
 
-            text = comment.lower()
-            for f, words in features.items():
-                if any(w in text for w in words):
-                    results[f] += 1
+    def analyze(company):
+        row = counts.get(company.lower())
+        results = {name: (getattr(row, name) or 0) if row else 0 for name, _, _ in features}
 
         total = sum(results.values()) or 1
         return {f: round((v / total) * 100, 1) for f, v in results.items()}
@@ -96,24 +125,10 @@ def feature_comparison(company1: str, company2: str, db: Session = Depends(get_d
     c1 = analyze(company1)
     c2 = analyze(company2)
 
-    # Trend per company
-    reviews_c1 = (
-        db.query(models.Review)
-        .join(models.Product, models.Product.id == models.Review.product_id)
-        .filter(func.lower(models.Product.company) == company1.lower())
-        .all()
-    )
-
-    reviews_c2 = (
-        db.query(models.Review)
-        .join(models.Product, models.Product.id == models.Review.product_id)
-        .filter(func.lower(models.Product.company) == company2.lower())
-        .all()
-    )
-
+    # Trend per company (aggregated in SQL)
     trend = {
-        company1: sentiment_trend_timewindow(reviews_c1),
-        company2: sentiment_trend_timewindow(reviews_c2),
+        company1: sentiment_trend_timewindow(db, company1),
+        company2: sentiment_trend_timewindow(db, company2),
     }
 
     feature_data = {
@@ -133,3 +148,11 @@ def feature_comparison(company1: str, company2: str, db: Session = Depends(get_d
         "trend": trend,
         "recommendation": rec
     }
+
+
+# -----------------------------
+# RESPONSE CACHE STATS
+# -----------------------------
+@router.get("/cache-stats")
+def cache_stats():
+    return analytics_cache.stats()
@@ -0,0 +1,61 @@
+"""
+One-off backfill for reviews.key_topic.
+
+Reviews ingested before key_topic was stored have NULL topics, so the
+deep-scan fingerprint lumps them under "other". This job fills them in
+by running each missing comment through analyze_sentiment once. The
+column itself comes from migration 0002 (python -m backend.migrate).
+
+Usage:
+    python -m backend.backfill_key_topics [--batch-size 100]
+"""
+import argparse
+
+from backend.database import SessionLocal, require_database_url
+from backend.migrate import require_up_to_date
+from backend import models
+from ai_module.ai_module import analyze_sentiment
+
+
+def backfill(batch_size=100):
+    require_database_url()
+    require_up_to_date()
+
+    db = SessionLocal()
+    updated = 0
+
+    try:
+        while True:
+            reviews = (
+                db.query(models.Review)
+                .filter(models.Review.key_topic.is_(None))
+                .order_by(models.Review.id)
+                .limit(batch_size)
+                .all()
+            )
+
+            if not reviews:
+                break
+
+            for review in reviews:
+                result = analyze_sentiment(review.comment)
+                review.key_topic = result.get("key_topic", "other") or "other"
+
+            # Commit per batch so an interrupted run keeps its progress
+            db.commit()
+            updated += len(reviews)
+            print(f"Backfilled {updated} reviews...")
+
+    finally:
+        db.close()
+
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill reviews.key_topic")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    total = backfill(args.batch_size)
+    print(f"Done. {total} reviews updated 👍")
@@ -0,0 +1,170 @@
+"""
+Bulk import of historical posts straight into the ingestion pipeline.
+
+Streams an NDJSON (.ndjson/.jsonl) or CSV file from disk, analyzes rows
+in batches through the same path as POST /ai/analyze/batch and writes
+each batch in one commit. Progress is checkpointed after every batch,
+so re-running the same command resumes where it stopped.
+
+Each row needs a "text" field; "latitude", "longitude" and "created_at"
+are optional.
+
+Usage:
+    python -m backend.bulk_import posts.ndjson [--batch-size 200]
+        [--concurrency 16] [--checkpoint FILE] [--restart]
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from backend.database import SessionLocal, require_database_url
+from backend.ai_routes import AnalyzeRequest, ingest_batch
+from ai_module.ai_module import llm_stats
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".ndjson", ".jsonl", ".json"):
+        return "ndjson"
+    raise ValueError(f"Cannot infer format from '{ext}', pass --format")
+
+
+def read_rows(path, fmt):
+    # Generators only → memory stays flat regardless of file size
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            for row in csv.DictReader(f):
+                yield row
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    # Parsed in to_request so one bad line only fails its row
+                    yield line
+
+
+def to_request(row):
+    if isinstance(row, str):
+        row = json.loads(row)
+
+    def number(value):
+        return float(value) if value not in (None, "") else None
+
+    return AnalyzeRequest(
+        text=row.get("text") or "",
+        latitude=number(row.get("latitude")),
+        longitude=number(row.get("longitude")),
+        created_at=row.get("created_at") or None
+    )
+
+
+# ============================================================
+# Checkpoint
+# ============================================================
+
+def load_checkpoint(checkpoint_path, source):
+    if not os.path.exists(checkpoint_path):
+        return None
+
+    with open(checkpoint_path) as f:
+        state = json.load(f)
+
+    return state if state.get("source") == source else None
+
+
+def save_checkpoint(checkpoint_path, state):
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+# ============================================================
+# Import Loop
+# ============================================================
+
+async def run_import(path, fmt, batch_size, concurrency, checkpoint_path, restart):
+    source = os.path.abspath(path)
+    state = None if restart else load_checkpoint(checkpoint_path, source)
+    state = state or {"source": source, "rows_done": 0, "processed": 0, "failed": 0}
+
+    if state["rows_done"]:
+        print(f"Resuming after row {state['rows_done']}")
+
+    rows = islice(read_rows(path, fmt), state["rows_done"], None)
+
+    started = time.monotonic()
+    llm_calls_at_start = llm_stats["calls"]
+    rows_this_run = 0
+
+    db = SessionLocal()
+    try:
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+
+            items = []
+            bad_rows = 0
+            for row in chunk:
+                try:
+                    items.append(to_request(row))
+                except (ValueError, TypeError):
+                    bad_rows += 1
+
+            results, _ = await ingest_batch(db, items, concurrency)
+            failed = bad_rows + sum(1 for r in results if not r["ok"])
+
+            state["rows_done"] += len(chunk)
+            state["processed"] += len(chunk) - failed
+            state["failed"] += failed
+            save_checkpoint(checkpoint_path, state)
+
+            rows_this_run += len(chunk)
+            elapsed = max(time.monotonic() - started, 1e-6)
+            llm_calls = llm_stats["calls"] - llm_calls_at_start
+
+            print(
+                f"{state['rows_done']} rows | "
+                f"{rows_this_run / elapsed:.1f} rows/s | "
+                f"{llm_calls / elapsed:.1f} LLM calls/s | "
+                f"{state['failed']} failed"
+            )
+    finally:
+        db.close()
+
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import posts from NDJSON/CSV")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["ndjson", "csv"])
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--checkpoint", help="defaults to <path>.checkpoint")
+    parser.add_argument("--restart", action="store_true", help="ignore existing checkpoint")
+    args = parser.parse_args()
+
+    require_database_url()
+    fmt = args.format or detect_format(args.path)
+    checkpoint_path = args.checkpoint or args.path + ".checkpoint"
+
+    state = asyncio.run(run_import(
+        args.path, fmt, args.batch_size, args.concurrency, checkpoint_path, args.restart
+    ))
+
+    print(
+        f"Done. {state['processed']} rows imported, {state['failed']} failed 👍 "
+        f"(new products get prices from the API's background refresher)"
+    )
+
+
+if __name__ == "__main__":
+    main()
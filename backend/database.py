@@ -4,12 +4,48 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL environment variable is not set")
+# Optional read-only replica for dashboard/analytics reads (get_read_db)
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
 
-engine = create_engine(DATABASE_URL)
+# ============================================================
+# CONNECTION POOL (per engine, per worker process)
+# ============================================================
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle before the server / proxy drops idle connections
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test connections on checkout → no errors after a DB restart or failover
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+
+
+def make_engine(url):
+    if url.startswith("sqlite"):
+        # SQLite pools are file handles, sizing knobs don't apply
+        return create_engine(url, pool_pre_ping=DB_POOL_PRE_PING)
+
+    return create_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING
+    )
+
+
+def require_database_url():
+    if not DATABASE_URL:
+        raise ValueError("DATABASE_URL environment variable is not set")
+
+
+# create_engine doesn't connect, so importing this module stays cheap.
+# Without DATABASE_URL, sessions fail on first use instead of at import.
+engine = make_engine(DATABASE_URL) if DATABASE_URL else None
+read_engine = make_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()   # 🔥 ADD THIS BACK
 
@@ -18,4 +54,14 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_read_db():
+    # Replica when DATABASE_READ_URL is set, otherwise the primary.
+    # Read-only: may lag the primary slightly, never write through it.
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,258 @@
+"""
+Streaming export of social posts and reviews.
+
+Rows are read with a server-side cursor (yield_per) and encoded batch
+by batch, so memory stays flat no matter how many rows are exported.
+Shared by GET /export/{table} and the CLI below.
+
+Formats:
+    ndjson   one JSON object per line
+    csv      header + rows
+    arrow    Arrow IPC stream (columnar)
+    parquet  Parquet, one row group per batch
+
+arrow / parquet use pyarrow (in requirements.txt), imported on first
+use so it stays off the import path; without it they answer 501.
+
+Usage:
+    python -m backend.export reviews -o reviews.parquet [--format parquet]
+        [--brand kia] [--start 2024-01-01] [--end 2024-07-01]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer
+
+from backend.database import ReadSessionLocal, require_database_url
+from backend import models
+from backend.pagination import filter_feed
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_COLUMNS = {
+    "posts": (models.SocialPost, (
+        "id", "brand", "text", "latitude", "longitude",
+        "sentiment", "confidence", "engine", "created_at"
+    )),
+    "reviews": (models.Review, (
+        "id", "product_id", "brand", "comment", "sentiment", "confidence",
+        "key_topic", "engine", "latitude", "longitude", "created_at"
+    )),
+}
+
+FORMATS = ("ndjson", "csv", "arrow", "parquet")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def columns_for(table):
+    model, names = EXPORT_COLUMNS[table]
+    return model, [getattr(model, name) for name in names]
+
+
+def iter_batches(table, brand=None, sentiment=None, start=None, end=None,
+                 batch_size=None):
+    """Yield lists of row tuples, holding one batch in memory at a time."""
+    batch_size = batch_size or EXPORT_BATCH_SIZE
+    model, columns = columns_for(table)
+
+    # Own session: a streamed response outlives the request's get_read_db()
+    db = ReadSessionLocal()
+    try:
+        query = db.query(*columns)
+        query = filter_feed(query, model, brand, sentiment, start, end)
+        query = query.order_by(model.id).yield_per(batch_size)
+
+        batch = []
+        for row in query:
+            batch.append(tuple(row))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+    finally:
+        db.close()
+
+
+# ============================================================
+# ENCODERS (batches of tuples → chunks of bytes)
+# ============================================================
+
+def encode_ndjson(names, batches):
+    for batch in batches:
+        yield "".join(
+            json.dumps(
+                {
+                    name: value.isoformat() if isinstance(value, datetime) else value
+                    for name, value in zip(names, row)
+                },
+                ensure_ascii=False
+            ) + "\n"
+            for row in batch
+        ).encode("utf-8")
+
+
+def encode_csv(names, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def arrow_schema(pa, columns):
+    def arrow_type(column):
+        if isinstance(column.type, Integer):
+            return pa.int64()
+        if isinstance(column.type, Float):
+            return pa.float64()
+        if isinstance(column.type, DateTime):
+            # Naive values (SQLite) are UTC already: stored via utcnow()
+            return pa.timestamp("us", tz="UTC")
+        return pa.string()
+
+    return pa.schema([(c.key, arrow_type(c)) for c in columns])
+
+
+class ChunkSink:
+    """Write-only file for pyarrow writers that hands back what was written.
+
+    tell() keeps counting across drains: parquet records absolute
+    row-group offsets in its footer.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        chunk = b"".join(self._chunks)
+        self._chunks = []
+        return chunk
+
+
+def encode_columnar(fmt, columns, batches):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema(pa, columns)
+    sink = ChunkSink()
+
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    try:
+        for batch in batches:
+            arrays = [
+                pa.array(values, type=field.type)
+                for values, field in zip(zip(*batch), schema)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        # Footer (parquet) / end-of-stream marker (arrow)
+        writer.close()
+
+    yield sink.drain()
+
+
+def columnar_available():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def export_stream(table, fmt, **filters):
+    """Chunks of the encoded export (bytes)."""
+    _, columns = columns_for(table)
+    names = [c.key for c in columns]
+    batches = iter_batches(table, **filters)
+
+    if fmt == "ndjson":
+        return encode_ndjson(names, batches)
+    if fmt == "csv":
+        return encode_csv(names, batches)
+    return encode_columnar(fmt, columns, batches)
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext in ("ndjson", "jsonl"):
+        return "ndjson"
+    if ext in ("csv", "arrow", "parquet"):
+        return ext
+    raise ValueError(f"Cannot infer format from '.{ext}', pass --format")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream posts or reviews to a file")
+    parser.add_argument("table", choices=EXPORT_COLUMNS)
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--brand")
+    parser.add_argument("--sentiment", choices=("positive", "negative", "neutral"))
+    parser.add_argument("--start", type=datetime.fromisoformat)
+    parser.add_argument("--end", type=datetime.fromisoformat)
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    require_database_url()
+    fmt = args.format or detect_format(args.output)
+    if fmt in ("arrow", "parquet") and not columnar_available():
+        parser.error(f"{fmt} export needs pyarrow (pip install pyarrow)")
+
+    written = 0
+    with open(args.output, "wb") as f:
+        for chunk in export_stream(
+            args.table, fmt,
+            brand=args.brand, sentiment=args.sentiment,
+            start=args.start, end=args.end, batch_size=args.batch_size
+        ):
+            f.write(chunk)
+            written += len(chunk)
+
+    print(f"Exported {args.table} → {args.output} ({fmt}, {written} bytes) 👍")
@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from backend.export import (
+    EXPORT_COLUMNS, FORMATS, MEDIA_TYPES, columnar_available, export_stream
+)
+
+router = APIRouter()
+
+
+# ============================================================
+# STREAMING EXPORT (posts / reviews → ndjson, csv, arrow, parquet)
+# ============================================================
+
+@router.get("/{table}")
+def export_table(
+    table: str,
+    format: str = Query("ndjson", pattern="^(" + "|".join(FORMATS) + ")$"),
+    brand: Optional[str] = None,
+    sentiment: Optional[str] = Query(None, pattern="^(positive|negative|neutral)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    if table not in EXPORT_COLUMNS:
+        raise HTTPException(status_code=404, detail=f"Unknown export '{table}'")
+
+    if format in ("arrow", "parquet") and not columnar_available():
+        raise HTTPException(status_code=501, detail=f"{format} export needs pyarrow installed")
+
+    extension = "jsonl" if format == "ndjson" else format
+
+    # Starlette pulls the generator chunk by chunk (in a threadpool),
+    # so nothing beyond one batch is ever held in memory
+    return StreamingResponse(
+        export_stream(table, format, brand=brand, sentiment=sentiment, start=start, end=end),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{extension}"'}
+    )
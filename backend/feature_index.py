@@ -0,0 +1,145 @@
+"""
+Feature-mention index for /analytics/feature-comparison.
+
+The keyword taxonomy lives in the features / feature_keywords tables
+(seeded from ai_module.local_engine.FEATURE_KEYWORDS on first use).
+Each review gets a feature_mask at ingest with one bit per feature
+whose keywords appear in the comment, so comparisons are a grouped
+count in SQL instead of scanning comment text per request.
+
+Existing reviews are indexed by migration 0005. After editing the
+taxonomy, recompute every mask:
+
+    python -m backend.feature_index --reindex
+"""
+import argparse
+import os
+import threading
+import time
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.database import SessionLocal, require_database_url
+from backend import models
+from backend.response_cache import bump_generation
+from ai_module.local_engine import FEATURE_KEYWORDS
+
+# How often a process re-reads the taxonomy tables
+FEATURE_TAXONOMY_TTL_SECONDS = int(os.getenv("FEATURE_TAXONOMY_TTL_SECONDS", "300"))
+
+
+def seed_taxonomy(db: Session):
+    if db.query(models.Feature).first() is not None:
+        return
+
+    for bit, (name, words) in enumerate(FEATURE_KEYWORDS.items()):
+        db.add(models.Feature(
+            name=name,
+            bit=bit,
+            keywords=[models.FeatureKeyword(keyword=w) for w in words]
+        ))
+
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker seeded it first
+        db.rollback()
+
+
+def mask_from(features, text):
+    """Bitmask of the features in [(name, bit, [keywords])] that text mentions."""
+    text = text.lower()
+    mask = 0
+    for _, bit, words in features:
+        if any(w in text for w in words):
+            mask |= 1 << bit
+    return mask
+
+
+class FeatureTaxonomy:
+
+    def __init__(self):
+        # [(name, bit, [keywords])] ordered by bit
+        self._features = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def features(self):
+        if self._features is None or time.time() - self._loaded_at > FEATURE_TAXONOMY_TTL_SECONDS:
+            self.reload()
+        return self._features
+
+    def reload(self):
+        # Own session: loading/seeding must never commit a caller's
+        # half-built ingest transaction
+        db = SessionLocal()
+        try:
+            seed_taxonomy(db)
+
+            rows = db.query(models.Feature).order_by(models.Feature.bit).all()
+            features = [
+                (f.name, f.bit, [k.keyword.lower() for k in f.keywords])
+                for f in rows
+            ]
+        finally:
+            db.close()
+
+        with self._lock:
+            self._features = features
+            self._loaded_at = time.time()
+
+    def mask_for(self, text):
+        return mask_from(self.features(), text)
+
+
+feature_taxonomy = FeatureTaxonomy()
+
+
+def reindex(db: Session, batch_size=1000):
+    """Recompute feature_mask for every review."""
+    feature_taxonomy.reload()
+
+    last_id = 0
+    updated = 0
+
+    while True:
+        rows = (
+            db.query(models.Review.id, models.Review.comment)
+            .filter(models.Review.id > last_id)
+            .order_by(models.Review.id)
+            .limit(batch_size)
+            .all()
+        )
+
+        if not rows:
+            break
+
+        db.bulk_update_mappings(models.Review, [
+            {"id": review_id, "feature_mask": feature_taxonomy.mask_for(comment)}
+            for review_id, comment in rows
+        ])
+        db.commit()
+
+        last_id = rows[-1].id
+        updated += len(rows)
+
+    bump_generation()
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain review feature masks")
+    parser.add_argument("--reindex", action="store_true", help="recompute every review's mask")
+    args = parser.parse_args()
+
+    if not args.reindex:
+        parser.error("nothing to do (use --reindex)")
+
+    require_database_url()
+    db = SessionLocal()
+    try:
+        total = reindex(db)
+        print(f"Reindexed {total} reviews 👍")
+    finally:
+        db.close()
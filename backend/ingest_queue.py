@@ -0,0 +1,242 @@
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.concurrency import run_in_threadpool
+
+from backend.database import SessionLocal
+from backend import models
+from backend.ai_routes import AnalyzeRequest, ingest_batch
+from backend.price_refresher import refresh_pending_prices
+
+# ============================================================
+# INGEST QUEUE WORKERS
+# POST /ai/analyze/enqueue only stores the raw post as a pending
+# IngestJob; these workers claim jobs in batches, run them through
+# ingest_batch and record the outcome in the same commit.
+# ============================================================
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "50"))
+INGEST_POLL_INTERVAL_SECONDS = float(os.getenv("INGEST_POLL_INTERVAL_SECONDS", "1"))
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))
+# Jobs stuck in "processing" this long belonged to a crashed worker
+INGEST_STALE_SECONDS = int(os.getenv("INGEST_STALE_SECONDS", "600"))
+
+
+def claim_jobs(limit):
+    """(claim token, [(job id, AnalyzeRequest)]) for up to `limit` pending jobs."""
+    db = SessionLocal()
+    try:
+        # SKIP LOCKED lets several processes pick disjoint batches on
+        # Postgres; the conditional UPDATE + claim token keeps claims
+        # exclusive on SQLite too, where FOR UPDATE is a no-op.
+        candidate_ids = [
+            job_id for (job_id,) in (
+                db.query(models.IngestJob.id)
+                .filter(models.IngestJob.status == "pending")
+                .order_by(models.IngestJob.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+        ]
+
+        if not candidate_ids:
+            db.commit()
+            return None, []
+
+        token = uuid.uuid4().hex
+
+        db.query(models.IngestJob).filter(
+            models.IngestJob.id.in_(candidate_ids),
+            models.IngestJob.status == "pending"
+        ).update({
+            "status": "processing",
+            "attempts": models.IngestJob.attempts + 1,
+            "claimed_by": token,
+            "claimed_at": datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
+
+        jobs = (
+            db.query(models.IngestJob)
+            .filter(models.IngestJob.claimed_by == token)
+            .order_by(models.IngestJob.id)
+            .all()
+        )
+
+        return token, [
+            (job.id, AnalyzeRequest(
+                text=job.text,
+                latitude=job.latitude,
+                longitude=job.longitude,
+                created_at=job.posted_at
+            ))
+            for job in jobs
+        ]
+    finally:
+        db.close()
+
+
+class ClaimLost(Exception):
+    """The stale sweeper released a job while this batch was still on it."""
+
+
+def release_stale_jobs():
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(seconds=INGEST_STALE_SECONDS)
+
+        def stale():
+            # Conditional UPDATEs, not load-then-save: a batch that commits
+            # meanwhile (status "done", fresh claimed_at) no longer matches
+            return db.query(models.IngestJob).filter(
+                models.IngestJob.status == "processing",
+                models.IngestJob.claimed_at < cutoff
+            )
+
+        failed = stale().filter(
+            models.IngestJob.attempts >= INGEST_MAX_ATTEMPTS
+        ).update({
+            "status": "failed",
+            "error": "Worker did not finish the job",
+            "finished_at": datetime.utcnow()
+        }, synchronize_session=False)
+
+        # Dropping the claim token makes the old batch's commit fail its
+        # ownership check (see process_jobs)
+        released = stale().update({
+            "status": "pending",
+            "claimed_by": None
+        }, synchronize_session=False)
+
+        db.commit()
+        return failed + released
+    finally:
+        db.close()
+
+
+def mark_failed(job_ids, token, error):
+    db = SessionLocal()
+    try:
+        # Only jobs this batch still owns: a job already "done" must never
+        # go back to pending (it would be ingested twice), and one the stale
+        # sweeper handed to another worker isn't ours any more
+        jobs = db.query(models.IngestJob).filter(
+            models.IngestJob.id.in_(job_ids),
+            models.IngestJob.status == "processing",
+            models.IngestJob.claimed_by == token
+        )
+
+        for job in jobs:
+            # Give transient errors (DB hiccup, etc.) another go
+            job.status = "pending" if job.attempts < INGEST_MAX_ATTEMPTS else "failed"
+            job.error = error
+        db.commit()
+    finally:
+        db.close()
+
+
+# Price lookups for new products run beside the queue: a worker never
+# waits on the LLM for them, and their errors can't fail the batch
+_price_tasks = set()
+
+
+def schedule_price_refresh(product_ids):
+    async def refresh():
+        try:
+            await refresh_pending_prices(product_ids)
+        except Exception as e:
+            # Still "pending": the periodic sweep picks them up
+            print(f"Price refresh for new products failed: {e}")
+
+    task = asyncio.create_task(refresh())
+    _price_tasks.add(task)
+    task.add_done_callback(_price_tasks.discard)
+
+
+async def process_jobs(token, claimed):
+    job_ids = [job_id for job_id, _ in claimed]
+    items = [item for _, item in claimed]
+
+    def record_outcome(db, results):
+        finished_at = datetime.utcnow()
+
+        # Same transaction as the batch's rows: if the sweeper handed any
+        # job to another worker, roll everything back instead of
+        # ingesting it twice. Touching claimed_at also keeps the sweeper
+        # off these jobs until we commit.
+        owned = db.query(models.IngestJob).filter(
+            models.IngestJob.id.in_(job_ids),
+            models.IngestJob.claimed_by == token,
+            models.IngestJob.status == "processing"
+        ).update({"claimed_at": finished_at}, synchronize_session=False)
+
+        if owned != len(job_ids):
+            raise ClaimLost(f"{len(job_ids) - owned} of {len(job_ids)} jobs were released")
+
+        jobs = {
+            job.id: job
+            for job in db.query(models.IngestJob).filter(
+                models.IngestJob.id.in_(job_ids),
+                models.IngestJob.claimed_by == token
+            )
+        }
+
+        for job_id, result in zip(job_ids, results):
+            job = jobs[job_id]
+            job.finished_at = finished_at
+
+            if result["ok"]:
+                job.status = "done"
+                job.result = json.dumps({k: v for k, v in result.items() if k not in ("index", "ok")})
+            else:
+                job.status = "failed"
+                job.error = result["error"]
+
+    db = SessionLocal()
+    try:
+        _, new_product_ids = await ingest_batch(db, items, before_commit=record_outcome)
+    finally:
+        db.close()
+
+    if new_product_ids:
+        schedule_price_refresh(new_product_ids)
+
+
+async def ingest_worker():
+    while True:
+        try:
+            token, claimed = await run_in_threadpool(claim_jobs, INGEST_BATCH_SIZE)
+        except Exception as e:
+            print(f"Ingest worker could not claim jobs: {e}")
+            token, claimed = None, []
+
+        if not claimed:
+            await asyncio.sleep(INGEST_POLL_INTERVAL_SECONDS)
+            continue
+
+        try:
+            await process_jobs(token, claimed)
+        except Exception as e:
+            print(f"Ingest batch failed: {e}")
+            await run_in_threadpool(mark_failed, [job_id for job_id, _ in claimed], token, str(e))
+
+
+async def stale_job_sweeper():
+    while True:
+        try:
+            await run_in_threadpool(release_stale_jobs)
+        except Exception as e:
+            print(f"Stale job sweep failed: {e}")
+
+        await asyncio.sleep(INGEST_STALE_SECONDS / 2)
+
+
+def start_ingest_workers(sweep_stale=True):
+    tasks = [asyncio.create_task(ingest_worker()) for _ in range(INGEST_WORKERS)]
+    if sweep_stale:
+        tasks.append(asyncio.create_task(stale_job_sweeper()))
+    return tasks
@@ -1,24 +1,73 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, text
 from datetime import datetime
+from typing import Optional
+from contextlib import asynccontextmanager
+import asyncio
+import os
+from anyio import to_thread
 
-from backend.database import get_db, engine
+from backend.database import get_db, get_read_db, require_database_url
 from backend import models
 from backend.schemas import SocialPostCreate
 from backend.ai_routes import router as ai_router
 from backend.analytics_extra import router as extra_router
 from fastapi.middleware.cors import CORSMiddleware
 from backend.analytics_routes import router as analytics_router
+from backend.export_routes import router as export_router
+from backend.sentiment_store import DBSentimentStore
+from backend.price_refresher import price_refresh_loop
+from backend.ingest_queue import start_ingest_workers
+from backend.snapshots import snapshot_refresh_loop
+from backend.response_cache import analytics_cache, bump_generation
+from backend.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, filter_feed, keyset_page
+from ai_module.ai_module import get_client, sentiment_cache
 
 # ============================================================
 # APP INIT
+# Importing this module has no side effects: the schema is managed by
+# `python -m backend.migrate`, clients are created in the lifespan.
 # ============================================================
-print("Creating tables...")
-models.Base.metadata.create_all(bind=engine)
-print("Tables created.")
 
-app = FastAPI(title="GeoDrive Insight API")
+# Threads per worker for sync endpoints / DB work (anyio's default is 40).
+# Keep DB_POOL_SIZE + DB_MAX_OVERFLOW in line with it.
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    require_database_url()
+
+    # Build the LLM client once per worker, before the first request
+    get_client()
+
+    # Optional persistent tier for the sentiment result cache
+    if os.getenv("SENTIMENT_CACHE_PERSIST", "0") == "1":
+        sentiment_cache.store = DBSentimentStore(
+            max_rows=int(os.getenv("SENTIMENT_CACHE_STORE_MAX_ROWS", "200000"))
+        )
+
+    # Sync endpoints and run_in_threadpool share this per-worker pool
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+    # Under gunicorn only one worker gets the periodic chores
+    # (see gunicorn.conf.py); a plain uvicorn process runs them itself
+    periodic = os.getenv("RUN_PERIODIC_TASKS", "1") == "1"
+
+    tasks = []
+    if periodic:
+        tasks += [
+            asyncio.create_task(price_refresh_loop()),
+            asyncio.create_task(snapshot_refresh_loop())
+        ]
+    tasks += start_ingest_workers(sweep_stale=periodic)
+    yield
+    for task in tasks:
+        task.cancel()
+
+
+app = FastAPI(title="GeoDrive Insight API", lifespan=lifespan)
 
 app.include_router(ai_router, prefix="/ai", tags=["AI"])
 app.include_router(
@@ -27,6 +76,7 @@ app.include_router(
     tags=["Analytics"]
 )
 app.include_router(extra_router, prefix="/analytics")
+app.include_router(export_router, prefix="/export", tags=["Export"])
 
 app.add_middleware(
     CORSMiddleware,
@@ -34,6 +84,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Snapshot-Age", "X-Snapshot-Computed-At"],
 )
 
 
@@ -48,6 +99,27 @@ def root():
     return {"status": "GeoDrive Insight backend running 🚀"}
 
 
+# ============================================================
+# HEALTH CHECKS (never call the LLM)
+# /healthz → process is up (liveness)
+# /readyz  → database reachable (readiness)
+# ============================================================
+
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz(db: Session = Depends(get_db)):
+    try:
+        db.execute(text("SELECT 1"))
+    except Exception:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+
+    return {"status": "ready"}
+
+
 # ============================================================
 # CREATE SOCIAL POST
 # ============================================================
@@ -66,6 +138,7 @@ def create_post(post: SocialPostCreate, db: Session = Depends(get_db)):
 
     db.add(db_post)
     db.commit()
+    bump_generation()
     db.refresh(db_post)
 
     return {
@@ -79,7 +152,11 @@ def create_post(post: SocialPostCreate, db: Session = Depends(get_db)):
 # ============================================================
 
 @app.get("/sentiment")
-def sentiment_by_brand(db: Session = Depends(get_db)):
+def sentiment_by_brand(request: Request, db: Session = Depends(get_read_db)):
+    return analytics_cache.respond(request, lambda: compute_sentiment_by_brand(db))
+
+
+def compute_sentiment_by_brand(db: Session):
     result = (
         db.query(
             models.SocialPost.brand,
@@ -101,25 +178,33 @@ def sentiment_by_brand(db: Session = Depends(get_db)):
 
 
 # ============================================================
-# GET ALL POSTS (FOR MAP PERSISTENCE)
+# MAP POSTS (keyset-paginated, see backend/pagination.py)
 # ============================================================
 
 @app.get("/posts")
-def get_posts(db: Session = Depends(get_db)):
-    posts = db.query(models.SocialPost).all()
+def get_posts(
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[int] = None,
+    since: Optional[int] = None,
+    brand: Optional[str] = None,
+    sentiment: Optional[str] = Query(None, pattern="^(positive|negative|neutral)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_read_db)
+):
+    # Plain column tuples → no ORM object per row
+    query = db.query(
+        models.SocialPost.id,
+        models.SocialPost.brand,
+        models.SocialPost.latitude,
+        models.SocialPost.longitude,
+        models.SocialPost.sentiment,
+        models.SocialPost.confidence,
+        models.SocialPost.created_at
+    )
+    query = filter_feed(query, models.SocialPost, brand, sentiment, start, end)
 
-    return [
-        {
-            "id": p.id,
-            "brand": p.brand,
-            "latitude": p.latitude,
-            "longitude": p.longitude,
-            "sentiment": p.sentiment,
-            "confidence": p.confidence,
-            "created_at": p.created_at
-        }
-        for p in posts
-    ]
+    return keyset_page(query, models.SocialPost.id, limit, cursor, since)
 
 
 # ============================================================
@@ -127,55 +212,31 @@ def get_posts(db: Session = Depends(get_db)):
 # ============================================================
 
 @app.get("/analytics/review-locations")
-def review_locations(db: Session = Depends(get_db)):
-    reviews = db.query(models.Review).filter(
+def review_locations(
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[int] = None,
+    since: Optional[int] = None,
+    brand: Optional[str] = None,
+    sentiment: Optional[str] = Query(None, pattern="^(positive|negative|neutral)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_read_db)
+):
+    query = db.query(
+        models.Review.id,
+        models.Review.brand,
+        models.Review.latitude,
+        models.Review.longitude,
+        models.Review.sentiment
+    ).filter(
         models.Review.latitude.isnot(None),
         models.Review.longitude.isnot(None)
-    ).all()
-
-    return [
-        {
-            "brand": r.brand,
-            "latitude": r.latitude,
-            "longitude": r.longitude,
-            "sentiment": r.sentiment
-        }
-        for r in reviews
-    ]
-
-
-# ============================================================
-# 🔥 NEW: COMPANY SUMMARY (for Company Insights Card)
-# ============================================================
-
-@app.get("/analytics/company-summary/{company}")
-def company_summary(company: str, db: Session = Depends(get_db)):
-
-    total_models = db.query(models.Product).filter(
-        func.lower(models.Product.company) == company.lower()
-    ).count()
-
-    product_ids = db.query(models.Product.id).filter(
-        func.lower(models.Product.company) == company.lower()
-    ).subquery()
-
-    total_reviews = db.query(models.Review).filter(
-        models.Review.product_id.in_(product_ids)
-    ).count()
+    )
+    query = filter_feed(query, models.Review, brand, sentiment, start, end)
 
-    positive_reviews = db.query(models.Review).filter(
-        models.Review.product_id.in_(product_ids),
-        models.Review.sentiment == "positive"
-    ).count()
+    return keyset_page(query, models.Review.id, limit, cursor, since)
 
-    positive_percent = int((positive_reviews / total_reviews) * 100) if total_reviews else 0
 
-    return {
-        "company": company.title(),
-        "total_models": total_models,
-        "total_reviews": total_reviews,
-        "overall_positive_percent": positive_percent
-    }
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("backend.main:app", host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+Apply pending schema migrations (backend/migrations/m*.py).
+
+Applied versions are recorded in schema_migrations, so running this
+again only applies what is new.
+
+Usage:
+    python -m backend.migrate            # apply pending migrations
+    python -m backend.migrate --status   # list applied / pending
+"""
+import argparse
+import importlib
+import pkgutil
+import sys
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, select
+
+from backend import migrations
+from backend.database import engine, require_database_url
+
+# Own metadata: not part of the app models / create_all
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", String, primary_key=True),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def available_migrations():
+    """[(version, module)] in the order they must run."""
+    names = sorted(
+        m.name for m in pkgutil.iter_modules(migrations.__path__)
+        if m.name.startswith("m")
+    )
+    return [(name[1:], importlib.import_module(f"backend.migrations.{name}")) for name in names]
+
+
+def applied_versions(bind=None):
+    if bind is None:
+        require_database_url()
+        bind = engine
+    schema_migrations.create(bind=bind, checkfirst=True)
+
+    with bind.connect() as conn:
+        return {row.version for row in conn.execute(select(schema_migrations.c.version))}
+
+
+def pending_versions(bind=None):
+    done = applied_versions(bind)
+    return [version for version, _ in available_migrations() if version not in done]
+
+
+def require_up_to_date(bind=None):
+    """For maintenance commands: refuse to run against an older schema."""
+    pending = pending_versions(bind)
+
+    if pending:
+        raise RuntimeError(
+            f"Database has pending migrations ({', '.join(pending)}), "
+            "run `python -m backend.migrate` first"
+        )
+
+
+def upgrade(bind=None):
+    """Apply every pending migration, each in its own transaction."""
+    if bind is None:
+        require_database_url()
+        bind = engine
+    done = applied_versions(bind)
+    applied = []
+
+    for version, module in available_migrations():
+        if version in done:
+            continue
+
+        with bind.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=version,
+                applied_at=datetime.now(timezone.utc)
+            ))
+
+        applied.append(version)
+        print(f"Applied migration {version}")
+
+    return applied
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--status", action="store_true", help="list applied / pending")
+    args = parser.parse_args()
+
+    if args.status:
+        done = applied_versions()
+        for version, module in available_migrations():
+            print(f"{'applied' if version in done else 'pending'}  {version}  {(module.__doc__ or '').strip()}")
+    else:
+        try:
+            applied = upgrade()
+        except RuntimeError as e:
+            # A migration refused to run (e.g. data it can't fix on its
+            # own); it stays pending until re-run
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"Database up to date ({len(applied)} applied) 👍")
@@ -0,0 +1,26 @@
+"""
+Versioned schema migrations, applied in file-name order by backend/migrate.py.
+
+Each module defines upgrade(conn) and runs in its own transaction.
+Migrations are frozen: they never import backend.models or other live
+code, so editing the app later can't change what an old migration does.
+Steps must be idempotent (IF NOT EXISTS, add_column_if_missing): 0001
+only creates tables that are missing, so databases that predate
+migrations pass through it and pick up the rest from 0002 on.
+"""
+from sqlalchemy import inspect, text
+
+
+def add_column_if_missing(conn, table, column, ddl_type):
+    columns = {c["name"] for c in inspect(conn).get_columns(table)}
+
+    if column not in columns:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+
+
+def create_index(conn, name, table, columns, unique=False):
+    # Raw SQL keeps migrations frozen (independent of today's models);
+    # expression indexes like lower(brand) work on Postgres and SQLite
+    conn.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({columns})"
+    ))
@@ -0,0 +1,126 @@
+"""Tables as of the move to migrations (previously create_all at import)."""
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, MetaData,
+    String, Table, Text, func
+)
+
+# Frozen copy of backend/models.py at the time: later model changes ship
+# as new migrations, never as edits here. The unique lower(model_name)
+# index is left to 0008, which checks for duplicates first.
+metadata = MetaData()
+
+products = Table(
+    "products", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("model_name", String, nullable=False, index=True),
+    Column("company", String, nullable=False, index=True),
+    Column("company_key", String, index=True),
+    Column("current_price", Float),
+    Column("price_status", String, index=True),
+)
+
+Table(
+    "price_history", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("product_id", Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("month", String),
+    Column("price", Float),
+)
+
+Table(
+    "availability", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("product_id", Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("region", String),
+    Column("available", Boolean),
+)
+
+reviews = Table(
+    "reviews", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("product_id", Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("comment", String, nullable=False),
+    Column("sentiment", String, index=True),
+    Column("confidence", Float),
+    Column("key_topic", String, index=True),
+    Column("engine", String, index=True),
+    Column("feature_mask", Integer),
+    Column("latitude", Float, index=True),
+    Column("longitude", Float, index=True),
+    Column("brand", String, index=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+Index("ix_reviews_product_id_sentiment", reviews.c.product_id, reviews.c.sentiment)
+Index("ix_reviews_brand_lower_created_at", func.lower(reviews.c.brand), reviews.c.created_at)
+
+Table(
+    "product_sentiment_stats", metadata,
+    Column("product_id", Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True),
+    Column("total", Integer, nullable=False),
+    Column("positive", Integer, nullable=False),
+    Column("negative", Integer, nullable=False),
+    Column("confidence_sum", Float, nullable=False),
+    Column("confidence_count", Integer, nullable=False),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "features", metadata,
+    Column("name", String, primary_key=True),
+    Column("bit", Integer, nullable=False, unique=True),
+)
+
+Table(
+    "feature_keywords", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("feature_name", String, ForeignKey("features.name", ondelete="CASCADE"), nullable=False, index=True),
+    Column("keyword", String, nullable=False),
+)
+
+Table(
+    "social_posts", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("brand", String, nullable=False, index=True),
+    Column("text", String, nullable=False),
+    Column("latitude", Float, index=True),
+    Column("longitude", Float, index=True),
+    Column("sentiment", String, index=True),
+    Column("confidence", Float),
+    Column("engine", String, index=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "sentiment_cache", metadata,
+    Column("key", String(64), primary_key=True),
+    Column("payload", Text, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now(), index=True),
+)
+
+Table(
+    "analytics_snapshots", metadata,
+    Column("name", String, primary_key=True),
+    Column("payload", Text, nullable=False),
+    Column("computed_at", DateTime(timezone=True), nullable=False),
+)
+
+Table(
+    "ingest_jobs", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("text", String, nullable=False),
+    Column("latitude", Float),
+    Column("longitude", Float),
+    Column("posted_at", DateTime(timezone=True)),
+    Column("status", String, nullable=False, index=True),
+    Column("attempts", Integer, nullable=False),
+    Column("error", String),
+    Column("result", Text),
+    Column("enqueued_at", DateTime(timezone=True), server_default=func.now()),
+    Column("claimed_by", String, index=True),
+    Column("claimed_at", DateTime(timezone=True)),
+    Column("finished_at", DateTime(timezone=True)),
+)
+
+
+def upgrade(conn):
+    metadata.create_all(bind=conn)
@@ -0,0 +1,16 @@
+"""Columns that create_all never added to databases created before them."""
+from backend.migrations import add_column_if_missing, create_index
+
+
+def upgrade(conn):
+    add_column_if_missing(conn, "social_posts", "engine", "VARCHAR")
+    create_index(conn, "ix_social_posts_engine", "social_posts", "engine")
+
+    add_column_if_missing(conn, "products", "price_status", "VARCHAR DEFAULT 'ready'")
+    create_index(conn, "ix_products_price_status", "products", "price_status")
+
+    add_column_if_missing(conn, "reviews", "key_topic", "VARCHAR")
+    add_column_if_missing(conn, "reviews", "engine", "VARCHAR")
+    add_column_if_missing(conn, "reviews", "feature_mask", "INTEGER DEFAULT 0")
+    create_index(conn, "ix_reviews_key_topic", "reviews", "key_topic")
+    create_index(conn, "ix_reviews_engine", "reviews", "engine")
@@ -0,0 +1,18 @@
+"""Index the hot analytics query shapes; normalized products.company_key."""
+from sqlalchemy import text
+
+from backend.migrations import add_column_if_missing, create_index
+
+
+def upgrade(conn):
+    # Company filters compare company_key = :company instead of lower(company)
+    add_column_if_missing(conn, "products", "company_key", "VARCHAR")
+    conn.execute(text(
+        "UPDATE products SET company_key = lower(company) "
+        "WHERE company_key IS NULL OR company_key != lower(company)"
+    ))
+    create_index(conn, "ix_products_company_key", "products", "company_key")
+
+    create_index(conn, "ix_reviews_product_id_sentiment", "reviews", "product_id, sentiment")
+    create_index(conn, "ix_reviews_brand_lower_created_at", "reviews", "lower(brand), created_at")
+    create_index(conn, "ix_social_posts_brand_lower", "social_posts", "lower(brand)")
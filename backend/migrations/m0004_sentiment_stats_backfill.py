@@ -0,0 +1,23 @@
+"""Fill product_sentiment_stats from the reviews already in the database."""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    # Same aggregate as backend.sentiment_stats.rebuild(), frozen as SQL.
+    # Without it a database that predates the rollup reports 0 reviews
+    # for every product until someone runs --rebuild by hand.
+    conn.execute(text("DELETE FROM product_sentiment_stats"))
+    conn.execute(text(
+        "INSERT INTO product_sentiment_stats "
+        "(product_id, total, positive, negative, confidence_sum, confidence_count, updated_at) "
+        "SELECT product_id, "
+        "count(id), "
+        "sum(CASE WHEN sentiment = 'positive' THEN 1 ELSE 0 END), "
+        "sum(CASE WHEN sentiment = 'negative' THEN 1 ELSE 0 END), "
+        "coalesce(sum(confidence), 0), "
+        "count(confidence), "
+        "CURRENT_TIMESTAMP "
+        "FROM reviews "
+        "WHERE product_id IS NOT NULL "
+        "GROUP BY product_id"
+    ))
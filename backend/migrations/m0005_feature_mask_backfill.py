@@ -0,0 +1,84 @@
+"""Seed the feature taxonomy and index feature_mask for existing reviews."""
+from sqlalchemy import text
+
+BATCH_SIZE = 1000
+
+# Frozen copies of ai_module.local_engine.FEATURE_KEYWORDS and
+# backend.feature_index.mask_from at the time: editing either later must
+# not change what this migration does
+FEATURE_KEYWORDS = {
+    "price": ["price", "cost", "expensive", "affordable", "value"],
+    "comfort": ["comfort", "seat", "interior"],
+    "performance": ["performance", "power", "engine", "speed"],
+    "mileage": ["mileage", "fuel", "economy"]
+}
+
+
+def mask_from(features, text):
+    text = text.lower()
+    mask = 0
+    for _, bit, words in features:
+        if any(w in text for w in words):
+            mask |= 1 << bit
+    return mask
+
+
+def seed_features(conn):
+    if conn.execute(text("SELECT 1 FROM features LIMIT 1")).first() is not None:
+        return
+
+    for bit, (name, words) in enumerate(FEATURE_KEYWORDS.items()):
+        conn.execute(
+            text("INSERT INTO features (name, bit) VALUES (:name, :bit)"),
+            {"name": name, "bit": bit}
+        )
+        conn.execute(
+            text("INSERT INTO feature_keywords (feature_name, keyword) VALUES (:name, :keyword)"),
+            [{"name": name, "keyword": w} for w in words]
+        )
+
+
+def load_features(conn):
+    features = {}
+    rows = conn.execute(text(
+        "SELECT f.name, f.bit, k.keyword FROM features f "
+        "JOIN feature_keywords k ON k.feature_name = f.name "
+        "ORDER BY f.bit"
+    ))
+    for name, bit, keyword in rows:
+        features.setdefault((name, bit), []).append(keyword.lower())
+
+    return [(name, bit, words) for (name, bit), words in features.items()]
+
+
+def upgrade(conn):
+    # On this connection: a separate session would deadlock on SQLite's
+    # write lock
+    seed_features(conn)
+    features = load_features(conn)
+
+    update = text("UPDATE reviews SET feature_mask = :mask WHERE id = :review_id")
+    last_id = 0
+
+    while True:
+        rows = conn.execute(
+            text(
+                "SELECT id, comment, feature_mask FROM reviews "
+                "WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE}
+        ).all()
+
+        if not rows:
+            break
+
+        changed = []
+        for review_id, comment, current in rows:
+            mask = mask_from(features, comment or "")
+            if mask != (current or 0):
+                changed.append({"review_id": review_id, "mask": mask})
+
+        if changed:
+            conn.execute(update, changed)
+
+        last_id = rows[-1][0]
@@ -0,0 +1,19 @@
+"""Shared response-cache generation counter (one row per cache)."""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS cache_generations ("
+        "name VARCHAR PRIMARY KEY, "
+        "generation INTEGER NOT NULL DEFAULT 0)"
+    ))
+
+    exists = conn.execute(text(
+        "SELECT 1 FROM cache_generations WHERE name = 'analytics'"
+    )).first()
+
+    if exists is None:
+        conn.execute(text(
+            "INSERT INTO cache_generations (name, generation) VALUES ('analytics', 0)"
+        ))
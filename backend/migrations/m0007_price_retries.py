@@ -0,0 +1,7 @@
+"""Attempt counter and backoff for failed price lookups."""
+from backend.migrations import add_column_if_missing
+
+
+def upgrade(conn):
+    add_column_if_missing(conn, "products", "price_attempts", "INTEGER DEFAULT 0")
+    add_column_if_missing(conn, "products", "price_retry_at", "TIMESTAMP WITH TIME ZONE")
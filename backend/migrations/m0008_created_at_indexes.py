@@ -0,0 +1,7 @@
+"""Index created_at for the start/end filters on trends and map feeds."""
+from backend.migrations import create_index
+
+
+def upgrade(conn):
+    create_index(conn, "ix_reviews_created_at", "reviews", "created_at")
+    create_index(conn, "ix_social_posts_created_at", "social_posts", "created_at")
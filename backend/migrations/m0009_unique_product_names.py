@@ -0,0 +1,37 @@
+"""Unique lower(model_name) index: race-safe product get-or-create."""
+from sqlalchemy import text
+
+from backend.migrations import create_index
+
+
+def duplicate_model_names(conn, limit=20):
+    return conn.execute(
+        text(
+            "SELECT lower(model_name) AS name, count(*) AS n FROM products "
+            "GROUP BY lower(model_name) HAVING count(*) > 1 "
+            "ORDER BY n DESC, name LIMIT :limit"
+        ),
+        {"limit": limit}
+    ).all()
+
+
+def upgrade(conn):
+    # Products created before the index existed may share a name. Fail
+    # (so the version stays pending in `migrate --status`) instead of
+    # recording an index that was never built.
+    duplicates = duplicate_model_names(conn)
+
+    if duplicates:
+        names = ", ".join(f"{name!r} ×{n}" for name, n in duplicates)
+        raise RuntimeError(
+            f"products has duplicate model names (case-insensitive): {names}. "
+            "Keep one product per name: point the others' reviews, "
+            "price_history and availability rows at it, delete the extra "
+            "products, run `python -m backend.sentiment_stats --rebuild`, "
+            "then re-run `python -m backend.migrate`."
+        )
+
+    create_index(
+        conn, "uq_products_model_name_lower", "products", "lower(model_name)",
+        unique=True
+    )
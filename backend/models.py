@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.database import Base
@@ -21,12 +21,24 @@ class SocialPost(Base):
     sentiment = Column(String, index=True)
     confidence = Column(Float)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # llm / local / local_fallback (which engine produced the sentiment)
+    engine = Column(String, index=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    __table_args__ = (
+        # Case-insensitive brand filter on the map feed / export
+        Index("ix_social_posts_brand_lower", func.lower(brand)),
+    )
 
 
 # ============================================================
 # PRODUCTS (Company + Model)
 # ============================================================
+def company_key_default(context):
+    return context.get_current_parameters()["company"].lower()
+
+
 class Product(Base):
     __tablename__ = "products"
 
@@ -36,8 +48,23 @@ class Product(Base):
     model_name = Column(String, index=True, nullable=False)
     company = Column(String, index=True, nullable=False)
 
+    # lower(company): company filters compare against this, index-backed
+    company_key = Column(String, index=True, default=company_key_default)
+
     current_price = Column(Float, default=0)
 
+    # pending → filled in by backend/price_refresher.py
+    price_status = Column(String, default="ready", index=True)
+
+    # Failed lookups: retried with backoff until PRICE_MAX_ATTEMPTS
+    price_attempts = Column(Integer, default=0)
+    price_retry_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # One product per model name, any casing (race-safe get-or-create)
+        Index("uq_products_model_name_lower", func.lower(model_name), unique=True),
+    )
+
     # 🔥 Relationships
     reviews = relationship(
         "Review",
@@ -81,6 +108,15 @@ class Review(Base):
     sentiment = Column(String, index=True)   # positive / negative / neutral
     confidence = Column(Float)
 
+    # 🧠 LLM topic captured at ingest (feeds the deep-scan fingerprint)
+    key_topic = Column(String, index=True)
+
+    # llm / local / local_fallback (which engine produced the sentiment)
+    engine = Column(String, index=True)
+
+    # Bit per feature mentioned in the comment (see Feature.bit)
+    feature_mask = Column(Integer, default=0)
+
     # 🌍 Location (for review map endpoint)
     latitude = Column(Float, index=True)
     longitude = Column(Float, index=True)
@@ -88,10 +124,76 @@ class Review(Base):
     # 🚀 Important for company insights & fast aggregation
     brand = Column(String, index=True)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     product = relationship("Product", back_populates="reviews")
 
+    __table_args__ = (
+        # Per-product sentiment counts / positive-only joins
+        Index("ix_reviews_product_id_sentiment", product_id, sentiment),
+        # Case-insensitive brand filters, optionally over a time range
+        Index("ix_reviews_brand_lower_created_at", func.lower(brand), created_at),
+    )
+
+
+# ============================================================
+# PRODUCT SENTIMENT STATS (Rollup maintained on review insert)
+# ============================================================
+class ProductSentimentStats(Base):
+    __tablename__ = "product_sentiment_stats"
+
+    product_id = Column(
+        Integer,
+        ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    total = Column(Integer, nullable=False, default=0)
+    positive = Column(Integer, nullable=False, default=0)
+    negative = Column(Integer, nullable=False, default=0)
+
+    # avg(confidence) = confidence_sum / confidence_count (NULLs skipped)
+    confidence_sum = Column(Float, nullable=False, default=0)
+    confidence_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# ============================================================
+# FEATURE TAXONOMY (Keywords behind /analytics/feature-comparison)
+# ============================================================
+class Feature(Base):
+    __tablename__ = "features"
+
+    name = Column(String, primary_key=True)
+
+    # Bit position in Review.feature_mask, never reused
+    bit = Column(Integer, unique=True, nullable=False)
+
+    keywords = relationship(
+        "FeatureKeyword",
+        back_populates="feature",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+
+class FeatureKeyword(Base):
+    __tablename__ = "feature_keywords"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    feature_name = Column(
+        String,
+        ForeignKey("features.name", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+
+    keyword = Column(String, nullable=False)
+
+    feature = relationship("Feature", back_populates="keywords")
+
 
 # ============================================================
 # PRICE HISTORY (Optional - For trend charts)
@@ -132,4 +234,73 @@ class Availability(Base):
     region = Column(String)
     available = Column(Boolean)
 
-    product = relationship("Product", back_populates="availability")
\ No newline at end of file
+    product = relationship("Product", back_populates="availability")
+
+
+# ============================================================
+# SENTIMENT CACHE (Optional persistent tier for LLM results)
+# ============================================================
+class SentimentCacheEntry(Base):
+    __tablename__ = "sentiment_cache"
+
+    # sha256 of model + prompt version + normalized text
+    key = Column(String(64), primary_key=True)
+
+    payload = Column(Text, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+# ============================================================
+# ANALYTICS SNAPSHOTS (dashboard aggregates, see backend/snapshots.py)
+# ============================================================
+class AnalyticsSnapshot(Base):
+    __tablename__ = "analytics_snapshots"
+
+    # e.g. "brand-summary", "market-sentiment-share"
+    name = Column(String, primary_key=True)
+
+    # Rendered JSON response body
+    payload = Column(Text, nullable=False)
+
+    computed_at = Column(DateTime(timezone=True), nullable=False)
+
+
+# ============================================================
+# RESPONSE CACHE GENERATIONS (shared by every worker process,
+# see backend/response_cache.py)
+# ============================================================
+class CacheGeneration(Base):
+    __tablename__ = "cache_generations"
+
+    # e.g. "analytics"
+    name = Column(String, primary_key=True)
+
+    # Bumped after every committed write that can change a cached response
+    generation = Column(Integer, nullable=False, default=0)
+
+
+# ============================================================
+# INGEST JOBS (DB-backed queue for POST /ai/analyze/enqueue)
+# ============================================================
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Raw post as received
+    text = Column(String, nullable=False)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    posted_at = Column(DateTime(timezone=True))
+
+    # pending → processing → done / failed
+    status = Column(String, index=True, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String)
+    result = Column(Text)   # JSON of the analysis result
+
+    enqueued_at = Column(DateTime(timezone=True), server_default=func.now())
+    claimed_by = Column(String, index=True)   # claim token of the worker batch
+    claimed_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
@@ -0,0 +1,51 @@
+import os
+
+from sqlalchemy import func
+
+# ============================================================
+# KEYSET PAGINATION (map feeds: /posts, /analytics/review-locations)
+# Pages run newest-first on the primary key, so every page is an
+# index range scan no matter how deep the client pages:
+#   cursor → next (older) page, rows with id < cursor
+#   since  → only rows inserted after the client's latest_id
+# created_at is a filter, not the sort key: bulk imports backfill
+# old timestamps, but a new row always gets a larger id.
+# ============================================================
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "500"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "5000"))
+
+
+def filter_feed(query, model, brand=None, sentiment=None, start=None, end=None):
+    if brand:
+        query = query.filter(func.lower(model.brand) == brand.lower())
+    if sentiment:
+        query = query.filter(model.sentiment == sentiment)
+    if start:
+        query = query.filter(model.created_at >= start)
+    if end:
+        query = query.filter(model.created_at < end)
+    return query
+
+
+def keyset_page(query, id_column, limit, cursor=None, since=None):
+    """One page of a column-projected query plus the cursors for the next call."""
+    if cursor is not None:
+        query = query.filter(id_column < cursor)
+    if since is not None:
+        query = query.filter(id_column > since)
+
+    # One extra row tells us whether another page exists
+    rows = query.order_by(id_column.desc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [dict(row._mapping) for row in rows]
+
+    return {
+        "items": items,
+        "next_cursor": items[-1]["id"] if has_more else None,
+        # Pass back as ?since= to fetch only newer rows
+        "latest_id": items[0]["id"] if items and cursor is None else since
+    }
+
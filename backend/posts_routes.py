@@ -4,6 +4,7 @@ from datetime import datetime
 from backend.database import get_db
 from backend import models
 from backend.schemas import SocialPostCreate
+from backend.response_cache import bump_generation
 
 router = APIRouter()
 
@@ -21,6 +22,7 @@ def create_post(post: SocialPostCreate, db: Session = Depends(get_db)):
 
     db.add(db_post)
     db.commit()
+    bump_generation()
     db.refresh(db_post)
 
     return {
@@ -0,0 +1,147 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, func, or_
+
+from backend.database import SessionLocal
+from backend import models
+from backend.singleflight import SingleFlight
+from backend.response_cache import bump_generation
+from ai_module.ai_module import fetch_model_price_async
+
+# ============================================================
+# BACKGROUND PRICE REFRESHER
+# New products are created with price_status="pending" and the
+# ingest request returns right away; prices are filled in here.
+# ============================================================
+
+PRICE_REFRESH_INTERVAL_SECONDS = int(os.getenv("PRICE_REFRESH_INTERVAL_SECONDS", "300"))
+PRICE_REFRESH_BATCH_SIZE = int(os.getenv("PRICE_REFRESH_BATCH_SIZE", "50"))
+# Failed lookups are retried after 1x, 2x, 4x ... this delay, then given up
+PRICE_RETRY_BASE_SECONDS = int(os.getenv("PRICE_RETRY_BASE_SECONDS", "600"))
+PRICE_MAX_ATTEMPTS = int(os.getenv("PRICE_MAX_ATTEMPTS", "5"))
+
+# model name (lowercase) → price, memoized for the process lifetime
+_price_cache = {}
+
+# Concurrent lookups of the same model share one provider call
+_price_lookups = SingleFlight()
+
+
+async def lookup_price(model_name):
+    key = model_name.strip().lower()
+
+    if key in _price_cache:
+        return _price_cache[key]
+
+    price = await _price_lookups.do(key, lambda: fetch_model_price_async(model_name))
+
+    # 0 is the lookup's failure value → don't memoize it
+    if price:
+        _price_cache[key] = price
+
+    return price
+
+
+def _load_pending(product_ids=None):
+    Product = models.Product
+    db = SessionLocal()
+    try:
+        query = db.query(Product.id, Product.model_name)
+
+        if product_ids:
+            query = query.filter(
+                Product.id.in_(product_ids),
+                Product.price_status == "pending"
+            )
+        else:
+            # Sweep: pending first, then failures whose backoff has passed
+            query = query.filter(or_(
+                Product.price_status == "pending",
+                and_(
+                    Product.price_status == "failed",
+                    func.coalesce(Product.price_attempts, 0) < PRICE_MAX_ATTEMPTS,
+                    or_(
+                        Product.price_retry_at.is_(None),
+                        Product.price_retry_at <= datetime.utcnow()
+                    )
+                )
+            )).order_by(Product.price_status == "failed")
+
+        return query.order_by(Product.id).limit(PRICE_REFRESH_BATCH_SIZE).all()
+    finally:
+        db.close()
+
+
+def _store_prices(prices):
+    Product = models.Product
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        month = now.strftime("%Y-%m")
+
+        for product_id, price in prices.items():
+            # The per-request task and the sweep can look up the same
+            # product at once: only the first to store a price wins
+            waiting = db.query(Product).filter(
+                Product.id == product_id,
+                Product.price_status != "ready"
+            )
+
+            if not price:
+                attempts = (db.query(Product.price_attempts).filter(
+                    Product.id == product_id
+                ).scalar() or 0) + 1
+
+                waiting.update({
+                    "price_status": "failed",
+                    "price_attempts": attempts,
+                    "price_retry_at": now + timedelta(
+                        seconds=PRICE_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+                    )
+                }, synchronize_session=False)
+                continue
+
+            stored = waiting.update({
+                "current_price": price,
+                "price_status": "ready",
+                "price_retry_at": None
+            }, synchronize_session=False)
+
+            if stored:
+                db.add(models.PriceHistory(
+                    product_id=product_id,
+                    month=month,
+                    price=price
+                ))
+
+        db.commit()
+        bump_generation()
+    finally:
+        db.close()
+
+
+async def refresh_pending_prices(product_ids=None):
+    pending = await run_in_threadpool(_load_pending, product_ids)
+    if not pending:
+        return 0
+
+    found = await asyncio.gather(*(lookup_price(name) for _, name in pending))
+    prices = {product_id: price for (product_id, _), price in zip(pending, found)}
+
+    await run_in_threadpool(_store_prices, prices)
+    return len(prices)
+
+
+async def price_refresh_loop():
+    # Sweeps anything the per-request background task missed
+    # (e.g. products created just before a restart)
+    while True:
+        try:
+            await refresh_pending_prices()
+        except Exception as e:
+            print(f"Price refresh failed: {e}")
+
+        await asyncio.sleep(PRICE_REFRESH_INTERVAL_SECONDS)
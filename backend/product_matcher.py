@@ -0,0 +1,194 @@
+import os
+import threading
+import time
+from collections import deque
+
+from backend.database import SessionLocal
+from backend import models
+
+# ============================================================
+# PRODUCT MATCHER (Aho-Corasick over product model names)
+# One pass over the post text finds every model name it contains;
+# cost depends on text length, not on catalog size.
+# ============================================================
+
+# Full rebuild interval, catches deletes/renames made by other workers
+PRODUCT_MATCHER_TTL_SECONDS = int(os.getenv("PRODUCT_MATCHER_TTL_SECONDS", "300"))
+# New products go to a small secondary automaton between full rebuilds;
+# past this many, the next refresh folds them in with a full rebuild
+PRODUCT_MATCHER_MAX_RECENT = int(os.getenv("PRODUCT_MATCHER_MAX_RECENT", "1000"))
+
+
+class _Automaton:
+
+    def __init__(self, patterns):
+        # patterns: iterable of (lowercase model name, product id)
+        self.goto = [{}]
+        self.fail = [0]
+        # best (length, -product_id) pattern ending at each node,
+        # including those reachable through failure links
+        self.best = [None]
+
+        for pattern, product_id in patterns:
+            if pattern:
+                self._insert(pattern, product_id)
+
+        self._link()
+
+    def _insert(self, pattern, product_id):
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.best.append(None)
+            node = nxt
+
+        # Duplicate names → keep the oldest product (lowest id)
+        candidate = (len(pattern), -product_id)
+        if self.best[node] is None or candidate > self.best[node]:
+            self.best[node] = candidate
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+
+                if node:
+                    f = self.fail[node]
+                    while f and ch not in self.goto[f]:
+                        f = self.fail[f]
+                    self.fail[child] = self.goto[f].get(ch, 0)
+
+                inherited = self.best[self.fail[child]]
+                if inherited is not None and (self.best[child] is None or inherited > self.best[child]):
+                    self.best[child] = inherited
+
+    def best_match(self, text):
+        """(length, -product_id) of the longest name in text, or None."""
+        node = 0
+        best = None
+
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+
+            found = self.best[node]
+            if found is not None and (best is None or found > best):
+                best = found
+
+        return best
+
+
+class ProductMatcher:
+    """Full automaton rebuilt on a TTL + secondary one for newer products.
+
+    Ingest only ever loads products with id > _max_id (one indexed range
+    query) and re-links the small secondary automaton, so its cost doesn't
+    grow with the catalog. The full rebuild reads every product through
+    its own session, never inside an ingest transaction.
+    """
+
+    def __init__(self):
+        self._automaton = _Automaton(())
+        self._recent = []   # (lowercase name, id) added since the full build
+        self._recent_automaton = _Automaton(())
+        self._max_id = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        # Held by the one thread doing a full rebuild
+        self._rebuild_lock = threading.Lock()
+
+    def rebuild(self, db):
+        rows = db.query(models.Product.model_name, models.Product.id).all()
+        automaton = _Automaton((name.lower(), pid) for name, pid in rows)
+        max_id = max((pid for _, pid in rows), default=0)
+
+        with self._lock:
+            # Keep anything caught up meanwhile that this snapshot missed
+            recent = [(name, pid) for name, pid in self._recent if pid > max_id]
+
+            self._automaton = automaton
+            self._recent = recent
+            self._recent_automaton = _Automaton(recent)
+            self._max_id = max([max_id] + [pid for _, pid in recent])
+            self._built_at = time.time()
+
+    def _expired(self):
+        return (
+            self._max_id is None
+            or time.time() - self._built_at > PRODUCT_MATCHER_TTL_SECONDS
+        )
+
+    def rebuild_if_expired(self):
+        if not self._expired():
+            return
+
+        # First build: everyone waits for it. After that one thread
+        # rebuilds and the others keep matching with the current automaton.
+        if not self._rebuild_lock.acquire(blocking=self._max_id is None):
+            return
+
+        try:
+            # Another thread may have finished while we waited
+            if self._expired():
+                db = SessionLocal()
+                try:
+                    self.rebuild(db)
+                finally:
+                    db.close()
+        finally:
+            self._rebuild_lock.release()
+
+    def catch_up(self, db):
+        # New products always get a higher id → indexed range scan
+        if self._max_id is None:
+            self.rebuild(db)
+            return
+
+        rows = (
+            db.query(models.Product.model_name, models.Product.id)
+            .filter(models.Product.id > self._max_id)
+            .all()
+        )
+        if not rows:
+            return
+
+        with self._lock:
+            recent = self._recent + [
+                (name.lower(), pid) for name, pid in rows if pid > self._max_id
+            ]
+
+            self._recent = recent
+            self._recent_automaton = _Automaton(recent)
+            self._max_id = max(pid for _, pid in recent)
+
+            if len(recent) > PRODUCT_MATCHER_MAX_RECENT:
+                # Fold into the full automaton on the next rebuild_if_expired
+                self._built_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._max_id = None
+            self._recent = []
+            self._recent_automaton = _Automaton(())
+
+    def longest_match(self, text_lower):
+        found = [
+            match for match in (
+                self._automaton.best_match(text_lower),
+                self._recent_automaton.best_match(text_lower)
+            )
+            if match is not None
+        ]
+        return -max(found)[1] if found else None
+
+
+product_matcher = ProductMatcher()
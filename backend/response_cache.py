@@ -0,0 +1,137 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import select, update
+
+from backend.database import engine, read_engine
+from backend import models
+
+# ============================================================
+# ANALYTICS RESPONSE CACHE
+# Keyed on route + query params. Write paths call bump_generation()
+# after committing; it bumps a shared row in cache_generations, so a
+# write in any worker process invalidates every worker's entries.
+# Each request reads the row once (one primary-key lookup) from the
+# same database the analytics read from: a replica only shows a bump
+# once it also has the write behind it.
+# ANALYTICS_CACHE_TTL_SECONDS is only a backstop (e.g. manual SQL edits).
+# Responses carry an ETag; a matching If-None-Match gets a bodiless 304.
+# ============================================================
+
+ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "30"))
+ANALYTICS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "1000"))
+
+
+class ResponseCache:
+
+    def __init__(self, name, ttl_seconds, max_entries):
+        # Row in cache_generations shared by every worker
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Last shared generation this process has seen
+        self.generation = 0
+
+        # key → (generation, stored_at, body, etag)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def bump(self):
+        with engine.begin() as conn:
+            conn.execute(
+                update(models.CacheGeneration)
+                .where(models.CacheGeneration.name == self.name)
+                .values(generation=models.CacheGeneration.generation + 1)
+            )
+
+    def load_generation(self):
+        with read_engine.connect() as conn:
+            generation = conn.execute(
+                select(models.CacheGeneration.generation)
+                .where(models.CacheGeneration.name == self.name)
+            ).scalar()
+
+        self.generation = generation or 0
+        return self.generation
+
+    def _lookup(self, key, generation):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            stored_generation, stored_at, body, etag = entry
+            if stored_generation != generation or time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return body, etag
+
+    def _store(self, key, generation, body, etag):
+        # Stored under the generation read *before* computing: a write that
+        # lands meanwhile bumps it, so this entry is never served after it
+        with self._lock:
+            self._entries[key] = (generation, time.time(), body, etag)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def respond(self, request: Request, compute):
+        """Cached JSON response for this request, computing it on a miss."""
+        key = request.url.path + "?" + "&".join(
+            f"{k}={v}" for k, v in sorted(request.query_params.multi_items())
+        )
+
+        generation = self.load_generation()
+        cached = self._lookup(key, generation)
+
+        if cached is not None:
+            self.hits += 1
+            body, etag = cached
+        else:
+            self.misses += 1
+            body = JSONResponse(content=jsonable_encoder(compute())).body
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            self._store(key, generation, body, etag)
+
+        # no-cache → browsers revalidate every poll, cheaply via the ETag
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if etag in request.headers.get("if-none-match", ""):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def stats(self):
+        return {
+            "generation": self.generation,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified
+        }
+
+
+analytics_cache = ResponseCache("analytics", ANALYTICS_CACHE_TTL_SECONDS, ANALYTICS_CACHE_MAX_ENTRIES)
+
+
+def bump_generation():
+    try:
+        analytics_cache.bump()
+    except Exception as e:
+        # The write itself is committed; don't fail the request over it.
+        # Entries still expire after ANALYTICS_CACHE_TTL_SECONDS.
+        print(f"Cache generation bump failed: {e}")
@@ -0,0 +1,157 @@
+"""
+Per-product sentiment rollup (product_sentiment_stats).
+
+Every Review insert bumps its product's counters in the same
+transaction, so analytics read one row per product instead of
+re-counting reviews. Existing data is backfilled by migration 0004;
+rebuild from scratch if the rollup ever drifts:
+
+    python -m backend.sentiment_stats --rebuild
+"""
+import argparse
+
+from sqlalchemy import case, func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.response_cache import bump_generation
+
+Stats = models.ProductSentimentStats
+
+COUNTERS = ("total", "positive", "negative", "confidence_sum", "confidence_count")
+
+
+# ============================================================
+# WRITE PATH
+# ============================================================
+
+def record_reviews(db: Session, reviews):
+    """Add new (not yet committed) reviews to the rollup."""
+    deltas = {}
+
+    for review in reviews:
+        d = deltas.setdefault(review.product_id, dict.fromkeys(COUNTERS, 0))
+        d["total"] += 1
+        d["positive"] += int(review.sentiment == "positive")
+        d["negative"] += int(review.sentiment == "negative")
+        if review.confidence is not None:
+            d["confidence_sum"] += review.confidence
+            d["confidence_count"] += 1
+
+    dialect = db.get_bind().dialect.name
+
+    # Sorted → concurrent writers lock rows in the same order
+    for product_id in sorted(deltas):
+        d = deltas[product_id]
+
+        if dialect in ("postgresql", "sqlite"):
+            insert_fn = pg_insert if dialect == "postgresql" else sqlite_insert
+            stmt = insert_fn(Stats).values(product_id=product_id, **d)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Stats.product_id],
+                set_={
+                    **{k: getattr(Stats, k) + stmt.excluded[k] for k in COUNTERS},
+                    "updated_at": func.now()
+                }
+            )
+            db.execute(stmt)
+            continue
+
+        row = db.query(Stats).filter(Stats.product_id == product_id).with_for_update().first()
+        if row is None:
+            db.add(Stats(product_id=product_id, **d))
+        else:
+            for k in COUNTERS:
+                setattr(row, k, getattr(row, k) + d[k])
+
+
+def rebuild(db: Session):
+    """Recompute the whole rollup from reviews with one grouped aggregate."""
+    db.query(Stats).delete(synchronize_session=False)
+
+    R = models.Review
+    aggregate = (
+        db.query(
+            R.product_id,
+            func.count(R.id),
+            func.sum(case((R.sentiment == "positive", 1), else_=0)),
+            func.sum(case((R.sentiment == "negative", 1), else_=0)),
+            func.coalesce(func.sum(R.confidence), 0),
+            func.count(R.confidence)
+        )
+        .group_by(R.product_id)
+    )
+
+    db.execute(
+        insert(Stats).from_select(["product_id", *COUNTERS], aggregate)
+    )
+    db.commit()
+    bump_generation()
+
+
+# ============================================================
+# READ PATH
+# ============================================================
+
+def summarize(row):
+    if row is None:
+        return {"total": 0, "positive": 0, "negative": 0, "avg_confidence": 0}
+
+    return {
+        "total": row.total,
+        "positive": row.positive,
+        "negative": row.negative,
+        "avg_confidence": (
+            row.confidence_sum / row.confidence_count if row.confidence_count else 0
+        )
+    }
+
+
+def stats_for(db: Session, product_ids):
+    """product_id → summarize(row), one query for any number of products."""
+    rows = db.query(Stats).filter(Stats.product_id.in_(list(product_ids))).all()
+    by_id = {row.product_id: row for row in rows}
+    return {pid: summarize(by_id.get(pid)) for pid in product_ids}
+
+
+def company_product_stats(db: Session, company: str):
+    """Every product of a company with its rollup counters, in one query.
+
+    LEFT JOIN keeps products that have no reviews yet (all zeros).
+    """
+    rows = (
+        db.query(
+            models.Product.id,
+            models.Product.model_name,
+            func.coalesce(Stats.total, 0).label("total"),
+            func.coalesce(Stats.positive, 0).label("positive"),
+            func.coalesce(Stats.negative, 0).label("negative")
+        )
+        .outerjoin(Stats, Stats.product_id == models.Product.id)
+        .filter(models.Product.company_key == company.lower())
+        .order_by(models.Product.id)
+        .all()
+    )
+
+    return rows
+
+
+if __name__ == "__main__":
+    from backend.database import SessionLocal, require_database_url
+
+    parser = argparse.ArgumentParser(description="Maintain product_sentiment_stats")
+    parser.add_argument("--rebuild", action="store_true", help="recompute from reviews")
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.error("nothing to do (use --rebuild)")
+
+    require_database_url()
+    db = SessionLocal()
+    try:
+        rebuild(db)
+        print(f"Rebuilt sentiment stats for {db.query(Stats).count()} products 👍")
+    finally:
+        db.close()
@@ -0,0 +1,73 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from backend.database import SessionLocal
+from backend import models
+
+
+# ============================================================
+# DB-backed persistent tier for ai_module.sentiment_cache
+# Enabled with SENTIMENT_CACHE_PERSIST=1 (see backend/main.py)
+# ============================================================
+class DBSentimentStore:
+
+    def __init__(self, max_rows=200000):
+        self.max_rows = max_rows
+
+    def get(self, key, ttl_seconds):
+        db = SessionLocal()
+        try:
+            entry = db.get(models.SentimentCacheEntry, key)
+            if entry is None:
+                return None
+
+            created_at = entry.created_at
+            if created_at is not None:
+                if created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=timezone.utc)
+                if datetime.now(timezone.utc) - created_at > timedelta(seconds=ttl_seconds):
+                    return None
+
+            return json.loads(entry.payload)
+        finally:
+            db.close()
+
+    def set(self, key, value):
+        db = SessionLocal()
+        try:
+            # merge → insert or overwrite (refreshes created_at for TTL)
+            db.merge(models.SentimentCacheEntry(
+                key=key,
+                payload=json.dumps(value),
+                created_at=datetime.now(timezone.utc)
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def prune(self, ttl_seconds):
+        db = SessionLocal()
+        try:
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds)
+
+            db.query(models.SentimentCacheEntry).filter(
+                models.SentimentCacheEntry.created_at < cutoff
+            ).delete(synchronize_session=False)
+
+            # Cap table size: drop everything older than the newest max_rows
+            oldest_kept = (
+                db.query(models.SentimentCacheEntry.created_at)
+                .order_by(models.SentimentCacheEntry.created_at.desc())
+                .offset(self.max_rows)
+                .limit(1)
+                .scalar()
+            )
+
+            if oldest_kept is not None:
+                db.query(models.SentimentCacheEntry).filter(
+                    models.SentimentCacheEntry.created_at <= oldest_kept
+                ).delete(synchronize_session=False)
+
+            db.commit()
+        finally:
+            db.close()
@@ -0,0 +1,28 @@
+import asyncio
+
+# ============================================================
+# SINGLE-FLIGHT REQUEST COALESCING
+# Concurrent callers asking for the same key share one in-flight
+# computation and all receive its result (or its exception).
+# ============================================================
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._inflight = {}
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def do(self, key, fn):
+        """Run fn() (a coroutine factory) once per key at a time."""
+        task = self._inflight.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # shield → one cancelled caller doesn't cancel the others' work
+        return await asyncio.shield(task)
@@ -0,0 +1,123 @@
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.database import SessionLocal, ReadSessionLocal
+from backend import models
+
+# ============================================================
+# ANALYTICS SNAPSHOTS
+# The heaviest dashboard aggregates are computed by a background
+# loop into analytics_snapshots; their endpoints only read one row
+# by primary key. Responses carry X-Snapshot-Age (seconds) and
+# X-Snapshot-Computed-At so clients can see how fresh they are.
+# ============================================================
+
+SNAPSHOT_REFRESH_INTERVAL_SECONDS = int(os.getenv("SNAPSHOT_REFRESH_INTERVAL_SECONDS", "60"))
+
+# name → compute(db), registered by the routers that serve them
+SNAPSHOTS = {}
+
+
+def snapshot_age(snapshot):
+    computed_at = snapshot.computed_at
+    if computed_at.tzinfo is None:
+        computed_at = computed_at.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - computed_at).total_seconds()
+
+
+def save_snapshot(db: Session, name, data):
+    snapshot = db.merge(models.AnalyticsSnapshot(
+        name=name,
+        payload=json.dumps(jsonable_encoder(data), ensure_ascii=False, separators=(",", ":")),
+        computed_at=datetime.now(timezone.utc)
+    ))
+    db.commit()
+    return snapshot
+
+
+def refresh_snapshot(name):
+    # The scan runs on the read replica (if any), the write on the primary
+    read_db = ReadSessionLocal()
+    try:
+        data = SNAPSHOTS[name](read_db)
+    finally:
+        read_db.close()
+
+    db = SessionLocal()
+    try:
+        try:
+            snapshot = save_snapshot(db, name, data)
+        except IntegrityError:
+            # Another worker inserted it first → theirs is just as fresh
+            db.rollback()
+            snapshot = db.get(models.AnalyticsSnapshot, name)
+
+        # Loaded + detached → still readable after close
+        db.refresh(snapshot)
+        db.expunge(snapshot)
+        return snapshot
+    finally:
+        db.close()
+
+
+def refresh_snapshots():
+    db = SessionLocal()
+    try:
+        stale = []
+        for name in SNAPSHOTS:
+            snapshot = db.get(models.AnalyticsSnapshot, name)
+
+            # With several workers, whoever gets there first does the scan
+            if snapshot is None or snapshot_age(snapshot) >= SNAPSHOT_REFRESH_INTERVAL_SECONDS / 2:
+                stale.append(name)
+    finally:
+        db.close()
+
+    for name in stale:
+        refresh_snapshot(name)
+
+    return len(stale)
+
+
+async def snapshot_refresh_loop():
+    while True:
+        try:
+            await run_in_threadpool(refresh_snapshots)
+        except Exception as e:
+            print(f"Snapshot refresh failed: {e}")
+
+        await asyncio.sleep(SNAPSHOT_REFRESH_INTERVAL_SECONDS)
+
+
+def snapshot_response(request: Request, db: Session, name):
+    """Latest snapshot as a JSON response (ETag / 304 aware)."""
+    snapshot = db.get(models.AnalyticsSnapshot, name)
+
+    if snapshot is None:
+        # Cold start before the first refresh: compute once inline
+        snapshot = refresh_snapshot(name)
+
+    body = snapshot.payload.encode("utf-8")
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "X-Snapshot-Age": str(int(snapshot_age(snapshot))),
+        "X-Snapshot-Computed-At": snapshot.computed_at.isoformat()
+    }
+
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
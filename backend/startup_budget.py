@@ -0,0 +1,86 @@
+"""
+Import-time budget for the API.
+
+Cold starts (Vercel's api/index.py, a fresh Render / gunicorn worker)
+pay for `import backend.main` before the first request is served.
+Importing must not touch the database or build the LLM client: the
+schema belongs to `python -m backend.migrate` and clients are created
+in the lifespan.
+
+Imports backend.main in a fresh interpreter, pointed at a database
+that does not exist, and exits non-zero if the import fails, connects
+anywhere, or takes longer than IMPORT_BUDGET_MS.
+
+Usage:
+    python -m backend.startup_budget [--budget-ms 1500] [--runs 3]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+IMPORT_BUDGET_MS = int(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import backend.main
+elapsed = (time.perf_counter() - start) * 1000
+print(f"{elapsed:.1f} {int('mistralai' in sys.modules)}")
+"""
+
+
+def measure_import():
+    """(milliseconds, llm_sdk_imported) for one cold `import backend.main`."""
+    with tempfile.TemporaryDirectory() as tmp:
+        # A connection would create this file: it must still be missing after
+        missing_db = os.path.join(tmp, "never-created.db")
+
+        env = dict(os.environ)
+        env["DATABASE_URL"] = f"sqlite:///{missing_db}"
+        env.pop("DATABASE_READ_URL", None)
+
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=REPO_ROOT,
+            env=env,
+            capture_output=True,
+            text=True
+        )
+
+        if result.returncode != 0:
+            raise RuntimeError(f"import backend.main failed:\n{result.stderr}")
+
+        if os.path.exists(missing_db):
+            raise RuntimeError("import backend.main connected to the database")
+
+    elapsed, sdk_imported = result.stdout.split()[-2:]
+    return float(elapsed), sdk_imported == "1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enforce the import-time budget")
+    parser.add_argument("--budget-ms", type=int, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="best of N cold imports")
+    args = parser.parse_args()
+
+    timings = []
+    for _ in range(args.runs):
+        elapsed, sdk_imported = measure_import()
+        if sdk_imported:
+            print("❌ import backend.main imported the LLM SDK (build it in the lifespan)")
+            sys.exit(1)
+        timings.append(elapsed)
+
+    best = min(timings)
+    print(f"import backend.main: {best:.0f} ms (budget {args.budget_ms} ms)")
+
+    if best > args.budget_ms:
+        print("❌ over the import budget")
+        sys.exit(1)
+
+    print("Within the import budget 👍")
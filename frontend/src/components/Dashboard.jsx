@@ -93,8 +93,9 @@ export default function Dashboard() {
 
   const fetchMapHistory = async () => {
     try {
-      const res = await axios.get(`${API}/posts`);
-      const formatted = res.data.map((item) => ({
+      // Newest page only; older pages via ?cursor=, newer via ?since=
+      const res = await axios.get(`${API}/posts`, { params: { limit: 500 } });
+      const formatted = res.data.items.map((item) => ({
         ...item,
         lat: item.latitude,
         lng: item.longitude,
@@ -0,0 +1,52 @@
+# ============================================================
+# PRODUCTION SERVER (gunicorn + uvicorn workers)
+#   gunicorn backend.main:app -c gunicorn.conf.py
+# One uvicorn event loop per worker process → one worker per core.
+# Every setting can be overridden from the environment.
+# ============================================================
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Render / Heroku set WEB_CONCURRENCY; default to one worker per core
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+
+# Idle keep-alive; keep it above the load balancer's idle timeout
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# A worker silent for this long is killed and replaced. Must cover the
+# slowest request: an LLM call with all its retries.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+
+# On deploy / SIGTERM, in-flight requests get this long to finish
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Recycle workers after N requests (+ jitter so they don't all restart
+# at once) → bounds slow memory growth. 0 disables.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+# ============================================================
+# PERIODIC TASKS ON ONE WORKER
+# Price sweep, snapshot refresh and stale-job sweep are per-deployment
+# chores; ingest queue workers run everywhere (SKIP LOCKED).
+# ============================================================
+
+def pre_fork(server, worker):
+    # Runs in the master: hand the chores to a new worker whenever no live
+    # worker has them (first boot, or the previous owner died / recycled)
+    worker.run_periodic_tasks = not any(
+        getattr(w, "run_periodic_tasks", False) for w in server.WORKERS.values()
+    )
+
+
+def post_fork(server, worker):
+    # Runs in the worker before the app is imported; read by the lifespan
+    os.environ["RUN_PERIODIC_TASKS"] = "1" if worker.run_periodic_tasks else "0"
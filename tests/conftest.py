@@ -0,0 +1,152 @@
+import json
+import os
+import tempfile
+
+# Before any backend import: the engine binds to DATABASE_URL at import
+_db_dir = tempfile.mkdtemp(prefix="geodrive-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.pop("DATABASE_READ_URL", None)
+os.environ["SENTIMENT_ENGINE"] = "llm"
+os.environ["SENTIMENT_CACHE_PERSIST"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import ai_module.ai_module as ai
+from backend import models
+from backend.database import SessionLocal, engine
+from backend.feature_index import feature_taxonomy
+from backend.main import app
+from backend.migrate import upgrade
+from backend.price_refresher import _price_cache
+from backend.product_matcher import product_matcher
+from backend.response_cache import bump_generation
+
+
+# ============================================================
+# FAKE LLM (no network; answers from keywords in the prompt)
+# ============================================================
+
+class FakeLLM:
+
+    def __init__(self):
+        self.prompts = []
+        self.chat = self
+
+    def answer(self, prompt):
+        self.prompts.append(prompt)
+
+        if "ex-showroom" in prompt:
+            return "1,250,000"
+
+        text = prompt.split("Text:")[-1].lower()
+        brand = "Hyundai" if "hyundai" in text else "Kia" if "kia" in text else "Unknown"
+        return json.dumps({
+            "brand": brand,
+            "sentiment": "positive" if "good" in text else "negative",
+            "confidence": 0.9,
+            "key_topic": "mileage" if "mileage" in text else "engine"
+        })
+
+    def _response(self, content):
+        message = type("Message", (), {"content": content})
+        choice = type("Choice", (), {"message": message})
+        return type("Response", (), {"choices": [choice]})
+
+    def complete(self, model, messages, **kwargs):
+        return self._response(self.answer(messages[0]["content"]))
+
+    async def complete_async(self, model, messages, **kwargs):
+        return self._response(self.answer(messages[0]["content"]))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    upgrade()
+
+
+@pytest.fixture(autouse=True)
+def llm(monkeypatch):
+    fake = FakeLLM()
+    monkeypatch.setattr(ai, "get_client", lambda: fake)
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    yield
+
+    with engine.begin() as conn:
+        for table in reversed(models.Base.metadata.sorted_tables):
+            # Seeded by the migrations, like the schema itself
+            if table.name != "cache_generations":
+                conn.execute(table.delete())
+
+    ai.sentiment_cache.clear()
+    product_matcher.invalidate()
+    feature_taxonomy._features = None
+    _price_cache.clear()
+    bump_generation()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    # No `with`: the lifespan's background loops stay off in tests
+    return TestClient(app)
+
+
+@pytest.fixture
+def count_queries():
+    """count_queries(fn) → number of SELECTs fn issues."""
+    def count(fn):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            fn()
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        return len(statements)
+
+    return count
+
+
+@pytest.fixture
+def add_legacy_product(db):
+    """Product + reviews written straight to the tables, the way data from
+    before the rollup / feature index looks after migrating."""
+    def add(model_name, company, reviews):
+        product = models.Product(model_name=model_name, company=company)
+        db.add(product)
+        db.flush()
+
+        for sentiment, key_topic, comment in reviews:
+            db.add(models.Review(
+                product_id=product.id,
+                brand=company,
+                comment=comment,
+                sentiment=sentiment,
+                confidence=0.9,
+                key_topic=key_topic,
+                feature_mask=0
+            ))
+
+        db.commit()
+        return product.id
+
+    return add
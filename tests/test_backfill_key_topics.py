@@ -0,0 +1,25 @@
+import pytest
+from sqlalchemy import create_engine
+
+from backend import models
+from backend.backfill_key_topics import backfill
+from backend.migrate import require_up_to_date
+
+
+def test_backfill_fills_missing_topics(db, add_legacy_product):
+    add_legacy_product("Creta SX", "Hyundai", [
+        ("positive", None, "Hyundai Creta mileage is good"),
+        ("negative", "service", "slow service"),
+    ])
+
+    assert backfill(batch_size=1) == 1
+
+    topics = sorted(topic for (topic,) in db.query(models.Review.key_topic))
+    assert topics == ["mileage", "service"]
+
+
+def test_maintenance_commands_refuse_an_unmigrated_schema(tmp_path):
+    bind = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+
+    with pytest.raises(RuntimeError, match="python -m backend.migrate"):
+        require_up_to_date(bind)
@@ -0,0 +1,68 @@
+import asyncio
+import re
+
+from backend import ai_routes, models
+
+
+def analyze_batch(client, texts):
+    response = client.post("/ai/analyze/batch", json={"items": [{"text": t} for t in texts]})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_results_come_back_in_input_order(client, monkeypatch):
+    analyze = ai_routes.analyze_sentiment_async
+
+    async def slow_first(text):
+        # "#0" finishes last, "#3" first
+        await asyncio.sleep(0.02 * (3 - int(re.search(r"#(\d)", text).group(1))))
+        return await analyze(text)
+
+    monkeypatch.setattr(ai_routes, "analyze_sentiment_async", slow_first)
+    texts = [f"Kia Seltos #{i} mileage is good" for i in range(4)]
+
+    body = analyze_batch(client, texts)
+
+    assert [r["index"] for r in body["results"]] == [0, 1, 2, 3]
+    assert body["processed"] == 4
+
+
+def test_errors_are_reported_per_item(client, db, monkeypatch):
+    analyze = ai_routes.analyze_sentiment_async
+
+    async def flaky(text):
+        if "boom" in text:
+            raise RuntimeError("provider exploded")
+        return await analyze(text)
+
+    monkeypatch.setattr(ai_routes, "analyze_sentiment_async", flaky)
+
+    body = analyze_batch(client, [
+        "Kia Seltos mileage is good",
+        "   ",
+        "Kia Seltos boom",
+        "Hyundai Creta engine is loud",
+    ])
+
+    assert (body["processed"], body["failed"]) == (2, 2)
+    assert [(r["index"], r["ok"], r.get("error")) for r in body["results"]] == [
+        (0, True, None),
+        (1, False, "Empty text"),
+        (2, False, "provider exploded"),
+        (3, True, None),
+    ]
+    # Failed items write nothing, the rest of the batch still commits
+    assert db.query(models.SocialPost).count() == 2
+
+
+def test_new_model_mentioned_twice_creates_one_product(client, db):
+    analyze_batch(client, [
+        "Hyundai Alcazar mileage is good",
+        "hyundai alcazar engine is rough",
+        "Hyundai Alcazar good mileage again",
+    ])
+
+    products = db.query(models.Product).all()
+    assert [p.model_name for p in products] == ["Hyundai Alcazar"]
+    assert {r.product_id for r in db.query(models.Review)} == {products[0].id}
+    assert db.query(models.Review).count() == 3
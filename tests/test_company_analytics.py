@@ -0,0 +1,40 @@
+import pytest
+
+from backend.analytics_extra import company_model_insights, compute_company_summary
+from backend.sentiment_stats import rebuild
+
+
+def add_models(add_legacy_product, count, start=0):
+    for i in range(start, start + count):
+        add_legacy_product(f"Model {i}", "Hyundai", [
+            ("positive", "mileage", "good mileage"),
+            ("negative", "engine", "engine noise"),
+        ])
+
+
+@pytest.mark.parametrize("endpoint", [
+    lambda db: compute_company_summary(db, "hyundai"),
+    lambda db: company_model_insights("hyundai", db),
+])
+def test_query_count_does_not_grow_with_products(db, add_legacy_product, count_queries, endpoint):
+    add_models(add_legacy_product, 2)
+    rebuild(db)
+    few = count_queries(lambda: endpoint(db))
+
+    add_models(add_legacy_product, 40, start=2)
+    rebuild(db)
+    many = count_queries(lambda: endpoint(db))
+
+    assert few == many == 1
+
+
+def test_company_summary_totals(client, db, add_legacy_product):
+    add_models(add_legacy_product, 3)
+    rebuild(db)
+
+    summary = client.get("/analytics/company-summary/Hyundai").json()
+
+    assert summary["company"] == "Hyundai"
+    assert summary["total_products"] == 3
+    assert summary["total_reviews"] == 6
+    assert summary["overall_positive_percent"] == 50
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from backend import models
+from backend.export import ChunkSink, export_stream
+
+CREATED_AT = datetime(2024, 3, 1, 12, 30)
+
+
+@pytest.fixture
+def posts(db):
+    rows = [
+        models.SocialPost(
+            brand="Kia", text=f"Seltos post {i}, \"quoted\"", latitude=19.0 + i,
+            longitude=72.5, sentiment="positive" if i % 2 else "negative",
+            confidence=0.5 + i / 10, engine="llm", created_at=CREATED_AT
+        )
+        for i in range(5)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return [(p.id, p.text, p.latitude, p.sentiment) for p in rows]
+
+
+def export(fmt, batch_size=2):
+    return list(export_stream("posts", fmt, batch_size=batch_size))
+
+
+def test_ndjson_round_trip(posts):
+    lines = b"".join(export("ndjson")).decode("utf-8").splitlines()
+    rows = [json.loads(line) for line in lines]
+
+    assert [(r["id"], r["text"], r["latitude"], r["sentiment"]) for r in rows] == posts
+    assert rows[0]["created_at"] == CREATED_AT.isoformat()
+
+
+def test_csv_round_trip(posts):
+    rows = list(csv.DictReader(io.StringIO(b"".join(export("csv")).decode("utf-8"))))
+
+    assert [
+        (int(r["id"]), r["text"], float(r["latitude"]), r["sentiment"]) for r in rows
+    ] == posts
+
+
+def test_csv_header_is_sent_once_across_batches(posts):
+    chunks = export("csv")
+
+    assert len(chunks) == 3
+    assert b"".join(chunks).count(b"id,brand,text") == 1
+
+
+def test_parquet_round_trip_one_row_group_per_batch(posts):
+    chunks = export("parquet")
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+    table = parquet.read()
+
+    assert parquet.num_row_groups == 3
+    assert list(zip(
+        table["id"].to_pylist(), table["text"].to_pylist(),
+        table["latitude"].to_pylist(), table["sentiment"].to_pylist()
+    )) == posts
+    assert table["created_at"][0].as_py() == CREATED_AT.replace(tzinfo=timezone.utc)
+
+    # Streamed: row groups go out as they're written, not in one final chunk
+    assert len(chunks) > 2
+
+
+def test_arrow_stream_round_trip(posts):
+    table = pa.ipc.open_stream(b"".join(export("arrow"))).read_all()
+
+    assert table["id"].to_pylist() == [p[0] for p in posts]
+
+
+def test_chunk_sink_drains_and_keeps_absolute_offsets():
+    sink = ChunkSink()
+
+    sink.write(b"abc")
+    sink.write(memoryview(b"de"))
+    assert sink.drain() == b"abcde"
+    assert sink.drain() == b""
+
+    sink.write(b"fg")
+    assert sink.tell() == 7
+    assert sink.drain() == b"fg"
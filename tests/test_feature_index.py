@@ -0,0 +1,39 @@
+from backend import models
+from backend.database import engine
+from backend.migrations import m0005_feature_mask_backfill
+
+
+def test_migration_indexes_existing_reviews(client, db, add_legacy_product):
+    add_legacy_product("Creta SX", "Hyundai", [
+        ("positive", None, "great mileage and comfy seat"),
+        ("negative", None, "too expensive"),
+    ])
+    add_legacy_product("Seltos HTX", "Kia", [
+        ("positive", None, "engine has power"),
+    ])
+
+    with engine.begin() as conn:
+        m0005_feature_mask_backfill.upgrade(conn)
+        # Idempotent: a second run finds nothing to change
+        m0005_feature_mask_backfill.upgrade(conn)
+
+    assert db.query(models.Review).filter(models.Review.feature_mask == 0).count() == 0
+
+    result = client.get(
+        "/analytics/feature-comparison", params={"company1": "hyundai", "company2": "kia"}
+    ).json()
+
+    # Share of positive mentions; the negative "expensive" review doesn't count
+    assert result["features1"] == {"price": 0.0, "comfort": 50.0, "performance": 0.0, "mileage": 50.0}
+    assert result["features2"]["performance"] == 100.0
+
+
+def test_ingest_and_migration_agree(client, db):
+    client.post("/ai/analyze", json={"text": "Hyundai Creta fuel economy is good"})
+    ingested = db.query(models.Review.id, models.Review.feature_mask).all()
+
+    with engine.begin() as conn:
+        m0005_feature_mask_backfill.upgrade(conn)
+
+    db.expire_all()
+    assert db.query(models.Review.id, models.Review.feature_mask).all() == ingested
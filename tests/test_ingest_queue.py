@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend import models
+from backend import ingest_queue
+from backend.ingest_queue import (
+    INGEST_STALE_SECONDS,
+    ClaimLost,
+    claim_jobs,
+    mark_failed,
+    process_jobs,
+    release_stale_jobs
+)
+
+
+def enqueue(client, text):
+    response = client.post("/ai/analyze/enqueue", json={"text": text})
+    assert response.status_code == 202
+    return response.json()["job_id"]
+
+
+def test_price_refresh_failure_does_not_reingest(client, db, monkeypatch):
+    async def failing_refresh(product_ids=None):
+        raise RuntimeError("price provider down")
+
+    monkeypatch.setattr(ingest_queue, "refresh_pending_prices", failing_refresh)
+    job_id = enqueue(client, "Hyundai Creta mileage is good")
+
+    async def run_worker_once():
+        token, claimed = claim_jobs(10)
+        await process_jobs(token, claimed)
+        # Let the fire-and-forget price refresh run (and fail)
+        await asyncio.sleep(0)
+        return token, claimed
+
+    token, claimed = asyncio.run(run_worker_once())
+
+    assert db.get(models.IngestJob, job_id).status == "done"
+    assert db.query(models.SocialPost).count() == 1
+    assert db.query(models.Review).count() == 1
+
+    # A late failure report for the batch must not reopen finished jobs
+    mark_failed([job_id for job_id, _ in claimed], token, "late error")
+    db.expire_all()
+
+    assert db.get(models.IngestJob, job_id).status == "done"
+    assert claim_jobs(10) == (None, [])
+
+
+def test_mark_failed_only_touches_own_claim(client, db):
+    job_id = enqueue(client, "Kia Seltos engine noise")
+    token, _ = claim_jobs(10)
+
+    mark_failed([job_id], "someone-else", "boom")
+    db.expire_all()
+    assert db.get(models.IngestJob, job_id).status == "processing"
+
+    mark_failed([job_id], token, "boom")
+    db.expire_all()
+    job = db.get(models.IngestJob, job_id)
+    assert job.status == "pending"
+    assert job.error == "boom"
+
+
+def make_stale(db, job_id):
+    db.query(models.IngestJob).filter_by(id=job_id).update(
+        {"claimed_at": datetime.utcnow() - timedelta(seconds=INGEST_STALE_SECONDS + 1)}
+    )
+    db.commit()
+
+
+def test_swept_and_reclaimed_job_is_ingested_once(client, db):
+    job_id = enqueue(client, "Hyundai Creta mileage is good")
+
+    slow_token, slow_claim = claim_jobs(10)
+    # The first worker is still busy when the sweeper gives up on it...
+    make_stale(db, job_id)
+    assert release_stale_jobs() == 1
+    # ...and a second worker claims the job again
+    fast_token, fast_claim = claim_jobs(10)
+
+    asyncio.run(process_jobs(fast_token, fast_claim))
+
+    with pytest.raises(ClaimLost):
+        asyncio.run(process_jobs(slow_token, slow_claim))
+
+    db.expire_all()
+    assert db.get(models.IngestJob, job_id).status == "done"
+    assert db.query(models.SocialPost).count() == 1
+    assert db.query(models.Review).count() == 1
+
+
+def test_sweeper_leaves_committed_jobs_alone(client, db):
+    job_id = enqueue(client, "Kia Seltos engine is good")
+    token, claimed = claim_jobs(10)
+    asyncio.run(process_jobs(token, claimed))
+
+    make_stale(db, job_id)
+
+    assert release_stale_jobs() == 0
+    db.expire_all()
+    assert db.get(models.IngestJob, job_id).status == "done"
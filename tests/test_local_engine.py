@@ -0,0 +1,38 @@
+import pytest
+
+from ai_module import ai_module
+from ai_module.local_engine import classify_topic, local_analyze
+
+
+@pytest.mark.parametrize("text, topic", [
+    ("premium interior", "comfort"),        # not "price" via "emi" in "premium"
+    ("pride of ownership", "other"),        # not "comfort" via "ride"
+    ("the seats are comfy", "comfort"),     # plurals still count
+    ("customer care was slow", "customer_support"),
+    ("emi is manageable", "price"),
+])
+def test_classify_topic_matches_whole_words(text, topic):
+    assert classify_topic(text) == topic
+
+
+def test_one_cue_never_clears_the_hybrid_threshold():
+    result = local_analyze("the ride is high quality")
+
+    assert result["confidence"] < 0.8
+
+
+def test_agreeing_cues_raise_confidence():
+    one = local_analyze("great car")["confidence"]
+    three = local_analyze("great smooth reliable car")["confidence"]
+    mixed = local_analyze("great smooth but noisy and weak")["confidence"]
+
+    assert one < three
+    assert three >= 0.8
+    assert mixed < one
+
+
+def test_hybrid_sends_single_cue_posts_to_the_llm(llm, monkeypatch):
+    monkeypatch.setattr(ai_module, "SENTIMENT_ENGINE", "hybrid")
+
+    assert ai_module.local_fast_path("the ride is high quality") is None
+    assert ai_module.local_fast_path("great smooth reliable car")["engine"] == "local"
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from backend import models
+from backend.migrate import pending_versions, upgrade
+
+
+@pytest.fixture
+def fresh_engine(tmp_path):
+    bind = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    yield bind
+    bind.dispose()
+
+
+def schema(bind):
+    """{table: (column names, index names)}; expression indexes included."""
+    inspector = inspect(bind)
+
+    with bind.connect() as conn:
+        indexes = conn.execute(text(
+            "SELECT tbl_name, name FROM sqlite_master "
+            "WHERE type = 'index' AND name NOT LIKE 'sqlite_autoindex%'"
+        )).all()
+
+    return {
+        table: (
+            {c["name"] for c in inspector.get_columns(table)},
+            {name for tbl, name in indexes if tbl == table}
+        )
+        for table in inspector.get_table_names()
+        if table != "schema_migrations"
+    }
+
+
+def test_migrations_build_the_model_schema(fresh_engine, tmp_path):
+    upgrade(fresh_engine)
+
+    expected = create_engine(f"sqlite:///{tmp_path / 'models.db'}")
+    models.Base.metadata.create_all(bind=expected)
+
+    assert schema(fresh_engine) == schema(expected)
+    assert pending_versions(fresh_engine) == []
+
+
+def test_duplicate_product_names_leave_the_unique_index_pending(fresh_engine):
+    upgrade(fresh_engine)
+
+    with fresh_engine.begin() as conn:
+        conn.execute(text("DROP INDEX uq_products_model_name_lower"))
+        conn.execute(text("DELETE FROM schema_migrations WHERE version = '0009_unique_product_names'"))
+        conn.execute(text(
+            "INSERT INTO products (id, model_name, company) "
+            "VALUES (1, 'Creta SX', 'Hyundai'), (2, 'creta sx', 'Hyundai')"
+        ))
+
+    with pytest.raises(RuntimeError, match="duplicate model names.*'creta sx' ×2"):
+        upgrade(fresh_engine)
+
+    assert pending_versions(fresh_engine) == ["0009_unique_product_names"]
+    assert "uq_products_model_name_lower" not in schema(fresh_engine)["products"][1]
+
+    with fresh_engine.begin() as conn:
+        conn.execute(text("DELETE FROM products WHERE id = 2"))
+
+    assert upgrade(fresh_engine) == ["0009_unique_product_names"]
+    assert "uq_products_model_name_lower" in schema(fresh_engine)["products"][1]
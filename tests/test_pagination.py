@@ -0,0 +1,65 @@
+from backend import models
+
+
+def add_posts(db, count, brand="Kia"):
+    posts = [
+        models.SocialPost(brand=brand, text=f"post {i}", sentiment="positive")
+        for i in range(count)
+    ]
+    db.add_all(posts)
+    db.commit()
+    return [p.id for p in posts]
+
+
+def get_page(client, **params):
+    response = client.get("/posts", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def ids(page):
+    return [item["id"] for item in page["items"]]
+
+
+def test_cursor_walks_every_row_once_newest_first(client, db):
+    post_ids = add_posts(db, 5)
+
+    seen = []
+    page = get_page(client, limit=2)
+    latest_id = page["latest_id"]
+
+    while True:
+        seen += ids(page)
+        if page["next_cursor"] is None:
+            break
+        page = get_page(client, limit=2, cursor=page["next_cursor"])
+
+    assert seen == sorted(post_ids, reverse=True)
+    assert latest_id == max(post_ids)
+
+
+def test_since_returns_only_newer_rows(client, db):
+    old_ids = add_posts(db, 3)
+    latest_id = get_page(client)["latest_id"]
+
+    new_ids = add_posts(db, 2)
+    page = get_page(client, since=latest_id)
+
+    assert ids(page) == sorted(new_ids, reverse=True)
+    assert page["latest_id"] == max(new_ids)
+
+    # Nothing newer → empty page, same latest_id to poll with again
+    page = get_page(client, since=page["latest_id"])
+    assert page == {"items": [], "next_cursor": None, "latest_id": max(new_ids)}
+    assert max(old_ids) < min(new_ids)
+
+
+def test_cursor_respects_filters(client, db):
+    kia = add_posts(db, 3, brand="Kia")
+    add_posts(db, 3, brand="Hyundai")
+
+    first = get_page(client, limit=2, brand="kia")
+    second = get_page(client, limit=2, brand="kia", cursor=first["next_cursor"])
+
+    assert ids(first) + ids(second) == sorted(kia, reverse=True)
+    assert second["next_cursor"] is None
@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from backend import models
+from backend import price_refresher
+from backend.price_refresher import PRICE_MAX_ATTEMPTS, _load_pending, _store_prices
+
+
+def add_pending_product(db, name="Creta SX"):
+    product = models.Product(model_name=name, company="Hyundai", price_status="pending")
+    db.add(product)
+    db.commit()
+    return product.id
+
+
+def test_concurrent_stores_write_one_price_history_row(db):
+    product_id = add_pending_product(db)
+
+    # Per-request task and sweep both found a price for the same product
+    _store_prices({product_id: 1250000})
+    _store_prices({product_id: 1250000})
+
+    assert db.query(models.PriceHistory).filter_by(product_id=product_id).count() == 1
+    assert db.get(models.Product, product_id).price_status == "ready"
+
+
+def test_failed_lookups_back_off_and_give_up(db):
+    product_id = add_pending_product(db)
+
+    _store_prices({product_id: 0})
+    product = db.get(models.Product, product_id)
+    assert (product.price_status, product.price_attempts) == ("failed", 1)
+
+    # Backoff not over yet → not swept
+    assert _load_pending() == []
+
+    for attempt in range(2, PRICE_MAX_ATTEMPTS + 1):
+        db.query(models.Product).update({"price_retry_at": datetime.utcnow() - timedelta(seconds=1)})
+        db.commit()
+        assert [pid for pid, _ in _load_pending()] == [product_id]
+        _store_prices({product_id: 0})
+
+    db.expire_all()
+    assert db.get(models.Product, product_id).price_attempts == PRICE_MAX_ATTEMPTS
+
+    db.query(models.Product).update({"price_retry_at": None})
+    db.commit()
+    # Attempts used up: no more LLM calls for this name
+    assert _load_pending() == []
+
+
+def test_sweep_prices_pending_products(db, llm):
+    product_id = add_pending_product(db)
+    price_refresher._price_cache.clear()
+
+    assert asyncio.run(price_refresher.refresh_pending_prices()) == 1
+
+    db.expire_all()
+    assert db.get(models.Product, product_id).current_price == 1250000
@@ -0,0 +1,89 @@
+import threading
+
+from backend import models
+from backend.product_matcher import ProductMatcher, product_matcher
+
+
+def add_products(db, *names):
+    products = [models.Product(model_name=name, company="Hyundai") for name in names]
+    db.add_all(products)
+    db.commit()
+    return [p.id for p in products]
+
+
+def test_new_products_are_added_without_a_full_rebuild(db, monkeypatch):
+    matcher = ProductMatcher()
+    creta, = add_products(db, "Creta")
+    matcher.rebuild_if_expired()
+
+    rebuilds = []
+    monkeypatch.setattr(matcher, "rebuild", lambda db: rebuilds.append(db))
+
+    creta_sx, venue = add_products(db, "Creta SX", "Venue")
+    matcher.rebuild_if_expired()
+    matcher.catch_up(db)
+
+    assert rebuilds == []
+    # Longest name wins across the full and the secondary automaton
+    assert matcher.longest_match("my creta sx is great") == creta_sx
+    assert matcher.longest_match("creta or venue?") == creta
+    assert matcher.longest_match("a venue review") == venue
+    assert matcher.longest_match("nothing here") is None
+
+
+def test_full_rebuild_folds_in_recent_products(db):
+    matcher = ProductMatcher()
+    matcher.rebuild_if_expired()
+    venue, = add_products(db, "Venue")
+    matcher.catch_up(db)
+
+    matcher.rebuild(db)
+
+    assert matcher._recent == []
+    assert matcher.longest_match("venue") == venue
+
+
+def test_ingest_matches_products_created_elsewhere(client, db):
+    client.post("/ai/analyze", json={"text": "Hyundai Creta is good"})
+    # Created by "another worker" after this one's matcher was built
+    alcazar, = add_products(db, "Alcazar Prestige")
+
+    client.post("/ai/analyze", json={"text": "the alcazar prestige mileage is good"})
+
+    review = db.query(models.Review).order_by(models.Review.id.desc()).first()
+    assert review.product_id == alcazar
+    assert product_matcher._recent_automaton.best_match("alcazar prestige") is not None
+
+
+def test_concurrent_expired_requests_rebuild_once(db, monkeypatch):
+    matcher = ProductMatcher()
+    add_products(db, "Creta")
+    matcher.rebuild_if_expired()
+    matcher._built_at = 0.0   # TTL expired
+
+    started, release = threading.Event(), threading.Event()
+    rebuilds = []
+
+    def slow_rebuild(db):
+        rebuilds.append(db)
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setattr(matcher, "rebuild", slow_rebuild)
+
+    first = threading.Thread(target=matcher.rebuild_if_expired)
+    first.start()
+    started.wait(5)
+
+    # Arrive while the rebuild runs: return at once, old automaton still works
+    others = [threading.Thread(target=matcher.rebuild_if_expired) for _ in range(4)]
+    for t in others:
+        t.start()
+    for t in others:
+        t.join(5)
+    assert not any(t.is_alive() for t in others)
+    assert matcher.longest_match("creta") is not None
+
+    release.set()
+    first.join(5)
+    assert len(rebuilds) == 1
@@ -0,0 +1,28 @@
+import pytest
+
+from backend.query_plans import ALLOWED_SCANS, check, full_scans, hot_queries
+
+
+def test_hot_analytics_queries_use_indexes(db, add_legacy_product):
+    add_legacy_product("Creta SX", "Hyundai", [("positive", "mileage", "good mileage")])
+
+    assert check() == []
+
+
+def test_allowlist_names_real_queries(db):
+    labels = {label for label, _ in hot_queries(db)}
+
+    assert {label for label, _ in ALLOWED_SCANS} <= labels
+
+
+@pytest.mark.parametrize("line, scans", [
+    ("SCAN reviews", ["reviews"]),
+    ("SCAN TABLE reviews", ["reviews"]),
+    ("SCAN social_posts USING COVERING INDEX ix_social_posts_brand", ["social_posts"]),
+    ("SEARCH reviews USING INDEX ix_reviews_product_id_sentiment (product_id=?)", []),
+    ("SCAN features", []),
+    ("  ->  Seq Scan on products  (cost=0.00..1.05 rows=1 width=4)", ["products"]),
+    ("  ->  Index Scan using ix_reviews_brand on reviews", []),
+])
+def test_full_scan_detection(line, scans):
+    assert full_scans([line]) == scans
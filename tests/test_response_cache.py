@@ -0,0 +1,36 @@
+from starlette.requests import Request
+
+from backend.response_cache import ResponseCache
+
+
+def make_request(path="/analytics/x", etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({
+        "type": "http", "method": "GET", "path": path,
+        "query_string": b"", "headers": headers
+    })
+
+
+def test_write_in_one_worker_invalidates_every_worker():
+    # Two processes = two caches sharing the cache_generations row
+    worker_a = ResponseCache("analytics", ttl_seconds=3600, max_entries=10)
+    worker_b = ResponseCache("analytics", ttl_seconds=3600, max_entries=10)
+    data = {"count": 1}
+
+    assert worker_a.respond(make_request(), lambda: dict(data)).body == b'{"count":1}'
+
+    data["count"] = 2
+    # Still cached: nothing was written through bump()
+    assert worker_a.respond(make_request(), lambda: dict(data)).body == b'{"count":1}'
+
+    worker_b.bump()
+
+    assert worker_a.respond(make_request(), lambda: dict(data)).body == b'{"count":2}'
+    assert worker_a.misses == 2
+
+
+def test_etag_revalidation():
+    cache = ResponseCache("analytics", ttl_seconds=3600, max_entries=10)
+    etag = cache.respond(make_request(), lambda: {"a": 1}).headers["etag"]
+
+    assert cache.respond(make_request(etag=etag), lambda: {"a": 1}).status_code == 304
@@ -0,0 +1,35 @@
+from backend import models
+from backend.database import engine
+from backend.migrations import m0004_sentiment_stats_backfill
+
+
+def test_migration_backfills_rollup(client, db, add_legacy_product):
+    add_legacy_product("Creta SX", "Hyundai", [
+        ("positive", "mileage", "good mileage"),
+        ("positive", "comfort", "good seats"),
+        ("negative", None, "engine noise"),
+    ])
+    assert db.query(models.ProductSentimentStats).count() == 0
+
+    with engine.begin() as conn:
+        m0004_sentiment_stats_backfill.upgrade(conn)
+
+    scan = client.post("/ai/analyze-product", json={"text": "creta"}).json()
+    assert scan["total_reviews"] == 3
+    assert scan["sentiment_summary"]["positive_percent"] == 66
+
+    summary = client.get("/analytics/company-summary/hyundai").json()
+    assert summary["total_reviews"] == 3
+
+
+def test_fingerprint_uses_its_own_denominator(client, db, add_legacy_product):
+    # No rollup rows at all: the fingerprint must still add up
+    add_legacy_product("Creta SX", "Hyundai", [
+        ("positive", "mileage", "good mileage"),
+        ("negative", None, "engine noise"),
+    ])
+
+    scan = client.post("/ai/analyze-product", json={"text": "creta"}).json()
+    strengths = {f["topic"]: f["strength"] for f in scan["fingerprint"]}
+
+    assert strengths == {"mileage": 50, "other": 50}
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from backend.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return f"{key}!"
+
+    async def main():
+        results = await asyncio.gather(
+            *(flight.do("a", lambda: compute("a")) for _ in range(5)),
+            flight.do("b", lambda: compute("b"))
+        )
+        return results, len(flight)
+
+    results, inflight_after = asyncio.run(main())
+
+    assert results == ["a!"] * 5 + ["b!"]
+    assert calls == ["a", "b"]
+    assert inflight_after == 0
+
+
+def test_exception_reaches_every_caller_and_clears_the_key():
+    flight = SingleFlight()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    async def main():
+        results = await asyncio.gather(
+            *(flight.do("k", failing) for _ in range(3)), return_exceptions=True
+        )
+        # Finished → the next call runs again instead of reusing the failure
+        with pytest.raises(RuntimeError):
+            await flight.do("k", failing)
+        return results
+
+    results = asyncio.run(main())
+
+    assert [str(r) for r in results] == ["provider down"] * 3
+    assert len(calls) == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", compute))
+        second = asyncio.ensure_future(flight.do("k", compute))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(main()) == (42, True)
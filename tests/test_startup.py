@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from backend.startup_budget import IMPORT_BUDGET_MS, REPO_ROOT, measure_import
+
+
+def test_import_stays_within_budget():
+    # measure_import() also fails if the import touches the database.
+    # Best of two, like the CLI's best of N: one slow run is just noise.
+    runs = [measure_import() for _ in range(2)]
+
+    assert not any(sdk_imported for _, sdk_imported in runs), "import pulled in the LLM SDK"
+    assert min(elapsed for elapsed, _ in runs) < IMPORT_BUDGET_MS
+
+
+@pytest.mark.parametrize("command", [
+    ["backend.migrate"],
+    ["backend.query_plans"],
+    ["backend.backfill_key_topics"],
+    ["backend.bulk_import", "posts.ndjson"],
+    ["backend.export", "posts", "-o", "posts.csv"],
+    ["backend.sentiment_stats", "--rebuild"],
+    ["backend.feature_index", "--reindex"],
+])
+def test_cli_requires_database_url(command, tmp_path):
+    # Empty (not unset) so a developer's .env can't fill it in
+    env = {**os.environ, "DATABASE_URL": "", "PYTHONPATH": REPO_ROOT}
+
+    result = subprocess.run(
+        [sys.executable, "-m", *command],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+
+    assert result.returncode != 0
+    assert "DATABASE_URL environment variable is not set" in result.stderr